@@ -0,0 +1,104 @@
+"""Лента в JSON-API против HTML: байты и задержка на страницу.
+
+Для index, group_posts и profile проходит --pages страниц по курсору
+в HTML-представлении и в JSON-API (все поля и ?fields=id,text) через
+django.test.Client и сравнивает размер тела и p50/p95 на страницу.
+
+    python benchmarks/api_feed.py --posts 100000 --pages 20
+"""
+import argparse
+import re
+import time
+
+from common import DEFAULT_DB, save_results, seed, setup_django, summarize
+
+# Ссылка на следующую страницу в posts/includes/paginator.html.
+NEXT_RE = re.compile(r'\?cursor=([\w-]+)[^>]*>\s*Следующая')
+
+
+def html_cursor(response):
+    match = NEXT_RE.search(response.content.decode())
+    return match.group(1) if match else None
+
+
+def json_cursor(response):
+    return response.json()['next']
+
+
+def walk(client, url, params, next_cursor, pages, repeat, cold):
+    """Проходит pages страниц repeat раз; задержки и средний размер."""
+    from django.core.cache import cache
+
+    latencies, sizes = [], []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        cursor = ''
+        for _ in range(pages):
+            if cold:
+                cache.clear()
+            begin = time.perf_counter()
+            response = client.get(url, dict(params, cursor=cursor))
+            latencies.append(time.perf_counter() - begin)
+            assert response.status_code == 200, (url, response)
+            sizes.append(len(response.content))
+            cursor = next_cursor(response)
+            if cursor is None:
+                break
+    summary = summarize(latencies, time.perf_counter() - started)
+    summary['bytes_mean'] = round(sum(sizes) / len(sizes))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--authors', type=int, default=1000)
+    parser.add_argument('--groups', type=int, default=100)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cold', action='store_true',
+                        help='Очищать кэш перед каждым запросом.')
+    parser.add_argument('--output', default='api_feed.json')
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    seed(args.authors, args.groups, args.posts)
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+    from posts.models import Group
+
+    group = Group.objects.filter(slug__startswith='bench').first()
+    author = (get_user_model().objects
+              .filter(username__startswith='bench').first())
+    feeds = {
+        'index': ('posts:index', 'posts:api_index', {}),
+        'group_posts': ('posts:group_list', 'posts:api_group_list',
+                        {'slug': group.slug}),
+        'profile': ('posts:profile', 'posts:api_profile',
+                    {'username': author.username}),
+    }
+    variants = (
+        ('html', 0, {}, html_cursor),
+        ('json', 1, {}, json_cursor),
+        ('json_sparse', 1, {'fields': 'id,text'}, json_cursor),
+    )
+    client = Client()
+    results = {}
+    for feed, names in feeds.items():
+        kwargs = names[2]
+        for variant, index, params, next_cursor in variants:
+            url = reverse(names[index], kwargs=kwargs)
+            name = f'{feed}_{variant}'
+            results[name] = walk(client, url, params, next_cursor,
+                                 args.pages, args.repeat, args.cold)
+            print(f'{name:>24}: {results[name]["bytes_mean"]:>7} байт, '
+                  f'p50 {results[name]["p50_ms"]} мс, '
+                  f'p95 {results[name]["p95_ms"]} мс')
+    save_results(args.output, vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
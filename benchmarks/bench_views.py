@@ -0,0 +1,254 @@
+"""Задержка, пропускная способность и SQL-запросы представлений yatube.
+
+Наполняет базу бенчмарка заданным объёмом данных и прогоняет index,
+group_posts, profile, post_details, post_create и post_edit двумя
+способами:
+
+* inprocess — через django.test.Client прямо в этом процессе, с
+  подсчётом SQL-запросов на каждый запрос;
+* server — через локальный WSGI-сервер из нескольких процессов-воркеров
+  на общем сокете и пул потоков-клиентов по HTTP; число SQL-запросов
+  берётся из заголовка Server-Timing.
+
+Результаты (p50/p95/p99, среднее, запросов в секунду, SQL-запросы)
+сохраняются в JSON, который можно сравнить с прошлым прогоном через
+benchmarks/compare.py.
+
+    python benchmarks/bench_views.py --posts 100000 --requests 300
+"""
+import argparse
+import multiprocessing
+import re
+import socket
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+
+from common import DEFAULT_DB, save_results, seed, setup_django, summarize
+
+WRITER = 'bench-writer'
+WRITER_PASSWORD = 'bench-password'
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+# Число запросов из Server-Timing (core.middleware.RequestMetricsMiddleware).
+QUERIES_RE = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+class Scenario:
+    """Набор запросов к одному представлению."""
+
+    def __init__(self, name, method, urls, data=None, login=False):
+        self.name = name
+        self.method = method
+        self.urls = urls
+        self.data = data
+        self.login = login
+
+    def url(self, i):
+        return self.urls[i % len(self.urls)]
+
+
+def build_scenarios(pages):
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from posts.models import Group, Post
+
+    User = get_user_model()
+    writer, created = User.objects.get_or_create(username=WRITER)
+    if created:
+        writer.set_password(WRITER_PASSWORD)
+        writer.save()
+    own_post = (Post.objects.filter(author=writer).first()
+                or Post.objects.create(author=writer, text='Пост для правки'))
+    group = Group.objects.filter(slug__startswith='bench').first()
+    author = User.objects.filter(username__startswith='bench').first()
+    post_ids = list(Post.objects.values_list('pk', flat=True)[:pages * 10])
+
+    def paged(url):
+        return [f'{url}?page={page}' for page in range(1, pages + 1)]
+
+    return [
+        Scenario('index', 'GET', paged(reverse('posts:index'))),
+        Scenario('group_posts', 'GET', paged(
+            reverse('posts:group_list', kwargs={'slug': group.slug}))),
+        Scenario('profile', 'GET', paged(
+            reverse('posts:profile', kwargs={'username': author.username}))),
+        Scenario('post_details', 'GET', [
+            reverse('posts:post_details', kwargs={'post_id': pk})
+            for pk in post_ids]),
+        Scenario('post_create', 'POST', [reverse('posts:post_create')],
+                 data={'text': 'Пост из бенчмарка', 'group': group.pk},
+                 login=True),
+        Scenario('post_edit', 'POST', [
+            reverse('posts:post_edit', kwargs={'post_id': own_post.pk})],
+            data={'text': 'Правка из бенчмарка', 'group': group.pk},
+            login=True),
+    ]
+
+
+def run_inprocess(scenarios, requests, cold):
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    guest = Client()
+    writer = Client()
+    writer.force_login(get_user_model().objects.get(username=WRITER))
+    results = {}
+    for scenario in scenarios:
+        client = writer if scenario.login else guest
+        send = client.post if scenario.method == 'POST' else client.get
+        latencies, queries = [], []
+        started = time.perf_counter()
+        for i in range(requests):
+            if cold:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                begin = time.perf_counter()
+                response = send(scenario.url(i), scenario.data)
+                latencies.append(time.perf_counter() - begin)
+            assert response.status_code < 400, (scenario.name, response)
+            queries.append(len(captured))
+        elapsed = time.perf_counter() - started
+        results[scenario.name] = summarize(latencies, elapsed, queries)
+        print(f'inprocess {scenario.name}: {results[scenario.name]}')
+    return results
+
+
+def serve(sock, host, port):
+    """Воркер: однопоточный WSGI-сервер на унаследованном сокете."""
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+    from django.core.wsgi import get_wsgi_application
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = WSGIServer((host, port), QuietHandler,
+                        bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    server.server_name, server.server_port = host, port
+    server.setup_environ()
+    server.set_app(get_wsgi_application())
+    server.serve_forever()
+
+
+def start_server(workers):
+    from django.db import connections
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(128)
+    host, port = sock.getsockname()
+    # Соединение с базой не должно достаться воркерам по наследству.
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=serve, args=(sock, host, port), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    return f'http://{host}:{port}', processes
+
+
+def http_client(base, login):
+    """Открывает HTTP-сессию; для записи логинится и берёт CSRF-токен."""
+    jar = CookieJar()
+    opener = urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(jar))
+    token = None
+    if login:
+        from django.urls import reverse
+        page = opener.open(base + reverse('users:login')).read().decode()
+        token = CSRF_RE.search(page).group(1)
+        opener.open(base + reverse('users:login'), urllib.parse.urlencode({
+            'username': WRITER, 'password': WRITER_PASSWORD,
+            'csrfmiddlewaretoken': token,
+        }).encode())
+        page = opener.open(base + reverse('posts:post_create')).read()
+        token = CSRF_RE.search(page.decode()).group(1)
+    return opener, token
+
+
+def run_server(scenarios, requests, workers, concurrency):
+    base, processes = start_server(workers)
+    time.sleep(0.5)
+    results = {}
+    try:
+        for scenario in scenarios:
+            opener, token = http_client(base, scenario.login)
+            data = None
+            if scenario.method == 'POST':
+                data = urllib.parse.urlencode(
+                    dict(scenario.data, csrfmiddlewaretoken=token)).encode()
+
+            def hit(i):
+                begin = time.perf_counter()
+                with opener.open(base + scenario.url(i), data) as response:
+                    response.read()
+                    timing = response.headers.get('Server-Timing', '')
+                match = QUERIES_RE.search(timing)
+                return (time.perf_counter() - begin,
+                        int(match.group(1)) if match else None)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                latencies, queries = zip(*pool.map(hit, range(requests)))
+            elapsed = time.perf_counter() - started
+            queries = [count for count in queries if count is not None]
+            results[scenario.name] = summarize(
+                list(latencies), elapsed, queries or None)
+            print(f'server {scenario.name}: {results[scenario.name]}')
+    finally:
+        for process in processes:
+            process.terminate()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--posts', type=int, default=10_000)
+    parser.add_argument('--authors', type=int, default=100)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Запросов на каждое представление.')
+    parser.add_argument('--pages', type=int, default=20,
+                        help='Сколько страниц лент обходить по кругу.')
+    parser.add_argument('--mode', choices=('inprocess', 'server', 'both'),
+                        default='both')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Процессов-воркеров WSGI-сервера.')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Параллельных HTTP-клиентов.')
+    parser.add_argument('--cold', action='store_true',
+                        help='Очищать кэш перед каждым запросом '
+                             '(только inprocess).')
+    parser.add_argument('--output', default='bench_views.json')
+    args = parser.parse_args()
+
+    # Сотни записей подряд от одного пользователя — это сам замер,
+    # а не злоупотребление.
+    setup_django(args.db, RATELIMIT_ENABLE=False)
+    seed(args.authors, args.groups, args.posts)
+    scenarios = build_scenarios(args.pages)
+
+    results = {}
+    if args.mode in ('inprocess', 'both'):
+        results['inprocess'] = run_inprocess(
+            scenarios, args.requests, args.cold)
+    if args.mode in ('server', 'both'):
+        results['server'] = run_server(
+            scenarios, args.requests, args.workers, args.concurrency)
+    save_results(args.output, dict(vars(args), db=str(args.db)), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Общие помощники бенчмарков: настройка Django и наполнение базы.
+
+Бенчмарки работают с отдельным файлом SQLite, чтобы не трогать
+рабочую базу проекта и переиспользовать уже наполненные данные.
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROJECT_DIR = ROOT / 'yatube'
+DEFAULT_DB = ROOT / 'benchmarks' / 'bench.sqlite3'
+
+
+def setup_django(db_path=DEFAULT_DB, **overrides):
+    """Настраивает Django на базу бенчмарка и применяет миграции.
+
+    Именованные аргументы заменяют одноимённые настройки до django.setup().
+    """
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def seed(authors, groups, posts, batch_size=10000, seed_value=0):
+    """Доводит базу до заданного объёма данных.
+
+    Посты вставляются сырым executemany пачками: bulk_create затирает
+    pub_date из-за auto_now_add, а для бенчмарков нужен разброс дат.
+    """
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from posts.models import Group, Post
+
+    User = get_user_model()
+    rnd = random.Random(seed_value)
+    texts = sample_texts(rnd)
+
+    existing = User.objects.filter(username__startswith='bench').count()
+    User.objects.bulk_create(
+        User(username=f'bench{i}', first_name='Автор', last_name=str(i))
+        for i in range(existing, authors)
+    )
+    existing = Group.objects.filter(slug__startswith='bench').count()
+    Group.objects.bulk_create(
+        Group(title=f'Группа {i}', slug=f'bench-{i}',
+              description='Группа для бенчмарка')
+        for i in range(existing, groups)
+    )
+    author_ids = list(User.objects.filter(username__startswith='bench')
+                      .values_list('pk', flat=True))
+    group_ids = list(Group.objects.filter(slug__startswith='bench')
+                     .values_list('pk', flat=True))
+
+    missing = posts - Post.objects.count()
+    if missing <= 0:
+        return
+    table = Post._meta.db_table
+    sql = (f'INSERT INTO {table} '
+           f'(text, pub_date, author_id, group_id, image) '
+           f'VALUES (%s, %s, %s, %s, %s)')
+    start = timezone.now() - timedelta(days=365 * 5)
+    span = 365 * 5 * 24 * 3600
+    while missing > 0:
+        size = min(batch_size, missing)
+        rows = [
+            (
+                rnd.choice(texts),
+                start + timedelta(seconds=rnd.randrange(span)),
+                rnd.choice(author_ids),
+                rnd.choice(group_ids + [None]),
+                '',
+            )
+            for _ in range(size)
+        ]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+        missing -= size
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    # Сырые INSERT не шлют сигналы: статистику авторов пересчитываем.
+    from django.core.management import call_command
+    call_command('rebuild_author_stats', stdout=open(os.devnull, 'w'))
+
+
+def sample_texts(rnd, size=1000):
+    """Набор правдоподобных текстов постов (Faker, если установлен)."""
+    try:
+        from faker import Faker
+    except ImportError:
+        return [f'Пост бенчмарка {i}' for i in range(size)]
+    fake = Faker('ru_RU')
+    fake.seed_instance(rnd.random())
+    return [fake.paragraph(nb_sentences=rnd.randint(1, 6))
+            for _ in range(size)]
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1,
+                      round(percent / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies, elapsed, queries=None):
+    """Сводка по замерам одного представления; время в миллисекундах."""
+    summary = {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'rps': round(len(latencies) / elapsed, 1),
+    }
+    if queries is not None:
+        summary['queries_mean'] = round(sum(queries) / len(queries), 2)
+        summary['queries_max'] = max(queries)
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(path, params, results):
+    """Сохраняет результаты с метаданными для сравнения между коммитами."""
+    payload = {
+        'revision': git_revision(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'params': params,
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(payload, output, ensure_ascii=False, indent=2)
@@ -0,0 +1,41 @@
+"""Сравнивает два JSON-результата бенчмарков представлений.
+
+    python benchmarks/compare.py old.json new.json
+"""
+import argparse
+import json
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'rps', 'queries_mean')
+
+
+def load(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f'{baseline["revision"]} -> {candidate["revision"]}')
+    for mode, views in candidate['results'].items():
+        for view, metrics in views.items():
+            old = baseline['results'].get(mode, {}).get(view)
+            if old is None:
+                continue
+            cells = []
+            for metric in METRICS:
+                if metric not in metrics or metric not in old:
+                    continue
+                before, after = old[metric], metrics[metric]
+                change = (after - before) / before * 100 if before else 0
+                cells.append(f'{metric} {before} -> {after} '
+                             f'({change:+.1f}%)')
+            print(f'{mode:9} {view:13} ' + '; '.join(cells))
+
+
+if __name__ == '__main__':
+    main()
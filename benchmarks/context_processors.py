@@ -0,0 +1,112 @@
+"""Цена контекст-процессоров и шапки с подвалом на один запрос.
+
+Для каждого процессора из settings.TEMPLATES замеряется вызов и вызов с
+обращением ко всем его значениям (так платит шаблон, который их
+использует). Отдельно сравнивается рендеринг шапки и подвала обычным
+{% include %} и {% cached_include %} для анонима без cookie сессии и
+для вошедшего пользователя.
+
+    python benchmarks/context_processors.py --repeat 2000
+"""
+import argparse
+import time
+
+from common import DEFAULT_DB, save_results, setup_django
+
+# Шаблон и переменные, от которых он зависит (как в base.html).
+CHROME = (('includes/header.html', ''), ('includes/footer.html', ' year'))
+
+
+def per_call(func, args):
+    """Среднее время вызова func на каждом из args в микросекундах."""
+    started = time.perf_counter()
+    for arg in args:
+        func(arg)
+    return round((time.perf_counter() - started) / len(args) * 1e6, 3)
+
+
+def login_cookie(user):
+    """Значение cookie сессии, в которой вошёл user."""
+    from django.contrib.auth import login
+    from django.contrib.sessions.middleware import SessionMiddleware
+    from django.test import RequestFactory
+
+    request = RequestFactory().get('/')
+    SessionMiddleware(lambda request: None).process_request(request)
+    login(request, user)
+    request.session.save()
+    return request.session.session_key
+
+
+def make_request(session_key=None):
+    """GET главной, прошедший через сессии и аутентификацию."""
+    from django.conf import settings
+    from django.contrib.auth.middleware import AuthenticationMiddleware
+    from django.contrib.sessions.middleware import SessionMiddleware
+    from django.test import RequestFactory
+    from django.urls import resolve
+
+    request = RequestFactory().get('/')
+    if session_key is not None:
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = session_key
+    SessionMiddleware(lambda request: None).process_request(request)
+    AuthenticationMiddleware(lambda request: None).process_request(request)
+    request.resolver_match = resolve('/')
+    return request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--output', default='context_processors.json')
+    args = parser.parse_args()
+
+    # Кэш фрагментов выключен при DEBUG, замеряется боевой режим.
+    setup_django(args.db, DEBUG=False)
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.template import engines
+    from django.utils.module_loading import import_string
+
+    user, _ = get_user_model().objects.get_or_create(username='bench-reader')
+    sessions = {'anonymous': None, 'user': login_cookie(user)}
+    processors = settings.TEMPLATES[0]['OPTIONS']['context_processors']
+    engine = engines.all()[0]
+    include = engine.from_string(''.join(
+        f'{{% include "{name}" %}}' for name, _ in CHROME))
+    cached = engine.from_string('{% load fragments %}' + ''.join(
+        f'{{% cached_include "{name}"{vary} %}}' for name, vary in CHROME))
+
+    results = {}
+    for kind, session_key in sessions.items():
+        # Свежий запрос на каждый вызов: пользователь и сессия кэшируются
+        # в объекте запроса после первого обращения.
+        def fresh():
+            return [make_request(session_key) for _ in range(args.repeat)]
+
+        for path in processors:
+            processor = import_string(path)
+
+            def read(request):
+                for value in processor(request).values():
+                    str(value)
+
+            results[f'{kind}:{path.rsplit(".", 1)[-1]}'] = {
+                'call_us': per_call(processor, fresh()),
+                'read_us': per_call(read, fresh()),
+            }
+        for name, template in (('include', include),
+                               ('cached_include', cached)):
+            results[f'{kind}:{name}'] = {'render_us': per_call(
+                lambda request: template.render({}, request), fresh())}
+
+    for name, result in results.items():
+        values = ', '.join(f'{key} {value}' for key, value in result.items())
+        print(f'{name:>30}: {values} мкс')
+    save_results(args.output, vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Планы запросов лент на большой таблице постов.
+
+Наполняет базу бенчмарка (по умолчанию миллион постов), строит для
+index, group_posts и profile те же запросы, что и представления, и
+сохраняет EXPLAIN QUERY PLAN. Скрипт падает, если какой-то из планов
+сортирует выборку целиком (USE TEMP B-TREE FOR ORDER BY) вместо обхода
+составного индекса.
+
+    python benchmarks/feed_plans.py --posts 1000000
+"""
+import argparse
+import json
+import time
+
+from common import DEFAULT_DB, setup_django, seed
+
+
+def explain(queryset):
+    from django.db import connection
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def timed(queryset, repeat=20):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        list(queryset)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--authors', type=int, default=1000)
+    parser.add_argument('--groups', type=int, default=100)
+    parser.add_argument('--page', type=int, default=50,
+                        help='Номер страницы для OFFSET-запросов.')
+    parser.add_argument('--output', default='feed_plans.json')
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    seed(args.authors, args.groups, args.posts)
+
+    from django.contrib.auth import get_user_model
+    from posts.models import Group, Post
+    from posts.paginators import FORWARD, CursorPaginator, encode_cursor
+    from posts.views import COUNT_POST
+
+    group = Group.objects.filter(slug__startswith='bench').first()
+    author = get_user_model().objects.filter(
+        username__startswith='bench').first()
+    offset = (args.page - 1) * COUNT_POST
+    feeds = {
+        'index': Post.objects.for_feed(),
+        'group_posts': group.posts.for_feed(),
+        'profile': author.posts.for_feed(),
+    }
+
+    results = {}
+    failed = False
+    for name, queryset in feeds.items():
+        start = min(offset, queryset.count() - 1)
+        pivot = queryset[start]
+        pages = {
+            'offset': queryset[start:start + COUNT_POST],
+            'cursor': CursorPaginator(queryset, COUNT_POST, name)
+            .page_queryset(encode_cursor(pivot, FORWARD)),
+        }
+        for mode, page in pages.items():
+            plan = explain(page)
+            uses_index = not any('TEMP B-TREE' in step for step in plan)
+            failed = failed or not uses_index
+            result = {
+                'plan': plan,
+                'uses_index_order': uses_index,
+                'page_ms': round(timed(page), 3),
+            }
+            results[f'{name}:{mode}'] = result
+            print(f'{name} ({mode}): {result["page_ms"]} ms')
+            for step in plan:
+                print(f'    {step}')
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump({'posts': args.posts, 'page': args.page,
+                   'feeds': results}, output, ensure_ascii=False, indent=2)
+    if failed:
+        raise SystemExit('Есть ленты, которые сортируются без индекса.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Лента подписок: выборка по IN против входящих с рассылкой.
+
+Читатель подписан на --following авторов. Сравнивается чтение страниц
+ленты запросом author_id IN (...) с сортировкой по дате и чтение из
+входящей ленты posts.inboxes (срез списка плюс id__in), в том числе с
+авторами-знаменитостями, которых подмешивают при чтении. Отдельно
+замеряется цена рассылки одного поста --followers подписчикам.
+
+    python benchmarks/follow_feed.py --posts 1000000 --following 200
+"""
+import argparse
+import time
+
+from common import (DEFAULT_DB, save_results, seed, setup_django,
+                    summarize)
+
+
+def timed(func, repeat):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - begin)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def ensure_users(prefix, count):
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    existing = User.objects.filter(username__startswith=prefix).count()
+    User.objects.bulk_create(
+        User(username=f'{prefix}{i}') for i in range(existing, count))
+    return list(User.objects.filter(username__startswith=prefix)
+                .order_by('pk').values_list('pk', flat=True)[:count])
+
+
+def ensure_follows(user_ids, author_ids):
+    from posts.models import Follow
+
+    Follow.objects.bulk_create(
+        (Follow(user_id=user_id, author_id=author_id)
+         for user_id in user_ids for author_id in author_ids),
+        ignore_conflicts=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--authors', type=int, default=1000)
+    parser.add_argument('--groups', type=int, default=100)
+    parser.add_argument('--following', type=int, default=200,
+                        help='На сколько авторов подписан читатель.')
+    parser.add_argument('--celebrities', type=int, default=5,
+                        help='Сколько из них подмешивать при чтении.')
+    parser.add_argument('--followers', type=int, default=1000,
+                        help='Подписчиков у автора в замере рассылки.')
+    parser.add_argument('--page', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--output', default='follow_feed.json')
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    seed(args.authors, args.groups, args.posts)
+
+    from django.core.cache import cache
+    from django.test import override_settings
+    from posts import inboxes
+    from posts.models import Post
+
+    from django.contrib.auth import get_user_model
+
+    # Авторы — пользователи, созданные seed(); читатели и подписчики
+    # названы иначе, чтобы seed() не раздавал им посты.
+    author_ids = list(get_user_model().objects
+                      .filter(username__startswith='bench').order_by('pk')
+                      .values_list('pk', flat=True)[:args.following])
+    reader_id, = ensure_users('reader', 1)
+    follower_ids = ensure_users('follower', args.followers)
+    ensure_follows([reader_id], author_ids)
+    # У знаменитостей и у автора для замера рассылки по --followers
+    # подписчиков, у остальных — только читатель.
+    celebrity_ids = author_ids[:args.celebrities]
+    fan_out_author = author_ids[-1]
+    ensure_follows(follower_ids, celebrity_ids + [fan_out_author])
+    offset = (args.page - 1) * 10
+    no_celebrities = override_settings(FOLLOW_FANOUT_LIMIT=10 ** 9)
+    hybrid = override_settings(FOLLOW_FANOUT_LIMIT=args.followers)
+
+    def fan_in(offset):
+        return lambda: list(Post.objects.for_feed()
+                            .filter(author_id__in=author_ids)
+                            [offset:offset + 10])
+
+    def inbox(offset):
+        return lambda: inboxes.FollowFeed(reader_id)[offset:offset + 10]
+
+    results = {}
+    cache.clear()
+    results['fan_in_page1'] = timed(fan_in(0), args.repeat)
+    results['fan_in_pageN'] = timed(fan_in(offset), args.repeat)
+    with no_celebrities:
+        # Первое чтение строит входящую ленту тем же медленным запросом.
+        results['inbox_build'] = timed(
+            lambda: (cache.clear(), inbox(0)()), max(1, args.repeat // 10))
+        results['inbox_page1'] = timed(inbox(0), args.repeat)
+        results['inbox_pageN'] = timed(inbox(offset), args.repeat)
+    with hybrid:
+        inbox(0)()
+        results['hybrid_page1'] = timed(inbox(0), args.repeat)
+        results['hybrid_pageN'] = timed(inbox(offset), args.repeat)
+
+    # Рассылка поста автору, у всех подписчиков которого входящие
+    # уже лежат в кэше.
+    with no_celebrities:
+        for follower_id in follower_ids:
+            inboxes.FollowFeed(follower_id)[0:10]
+        post = Post.objects.filter(author_id=fan_out_author).first()
+        results['fan_out_post'] = timed(lambda: inboxes.fan_out(post),
+                                        max(1, args.repeat // 10))
+
+    for name, summary in results.items():
+        print(f'{name:>14}: p50 {summary["p50_ms"]} мс, '
+              f'p95 {summary["p95_ms"]} мс')
+    save_results(args.output, vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
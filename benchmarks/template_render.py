@@ -0,0 +1,117 @@
+"""Время рендеринга posts/index.html с 10 постами.
+
+Сравнивает настройки шаблонов профиля dev (загрузчики без кэша,
+debug-процессор контекста) с профилем prod (cached.Loader, без
+debug-процессора, прогрев при старте). Посты строятся в памяти, кэш
+фрагментов отключён, так что замеряется только шаблонизатор.
+
+    python benchmarks/template_render.py --repeat 2000
+"""
+import argparse
+import importlib
+import os
+import time
+
+from common import DEFAULT_DB, save_results, setup_django, summarize
+
+TEMPLATE = 'posts/index.html'
+POSTS = 10
+
+
+def build_context():
+    from django.contrib.auth import get_user_model
+    from django.core.paginator import Paginator
+    from django.utils import timezone
+    from posts.models import Group, Post
+
+    User = get_user_model()
+    group = Group(pk=1, title='Группа', slug='bench-group')
+    posts = []
+    for i in range(1, POSTS + 1):
+        author = User(pk=i, username=f'bench{i}', first_name='Автор',
+                      last_name=str(i))
+        posts.append(Post(pk=i, text=f'Пост бенчмарка {i} ' * 20,
+                          author=author, group=group if i % 2 else None,
+                          pub_date=timezone.now()))
+    page_obj = Paginator(posts, POSTS).page(1)
+    return {
+        'page_obj': page_obj,
+        'feed_cache_key': 'bench',
+        'feed_cache_timeout': 0,
+    }
+
+
+def build_request():
+    from django.contrib.auth.models import AnonymousUser
+    from django.test import RequestFactory
+    from django.urls import resolve
+
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    request.resolver_match = resolve('/')
+    return request
+
+
+def build_backend(name, params):
+    from django.utils.module_loading import import_string
+
+    params = dict(params, NAME=name)
+    params['OPTIONS'] = dict(params.get('OPTIONS', {}))
+    backend = import_string(params.pop('BACKEND'))
+    return backend(params)
+
+
+def measure(backend, context, request, repeat, warmup):
+    if warmup:
+        from core.template_backends import warm_templates
+        warm_templates([backend])
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        backend.get_template(TEMPLATE).render(context, request)
+        latencies.append(time.perf_counter() - begin)
+    summary = summarize(latencies, time.perf_counter() - started)
+    summary['loaders'] = [
+        type(loader).__module__ + '.' + type(loader).__name__
+        for loader in backend.engine.template_loaders
+    ]
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--repeat', type=int, default=1000)
+    parser.add_argument('--output', default='template_render.json')
+    args = parser.parse_args()
+
+    # Кэш фрагментов ленты иначе отдал бы готовый HTML со второго рендера.
+    setup_django(args.db, CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+
+    # Профиль prod без секретного ключа не импортируется.
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark')
+    default = importlib.import_module('yatube.settings.dev')
+    production = importlib.import_module('yatube.settings.prod')
+
+    context = build_context()
+    request = build_request()
+    results = {}
+    for label, settings_module, warmup in (
+            ('default', default, False),
+            ('production', production, True)):
+        backend = build_backend(label, settings_module.TEMPLATES[0])
+        results[label] = measure(backend, context, request, args.repeat,
+                                 warmup)
+        print(f'{label:>10}: p50 {results[label]["p50_ms"]} мс, '
+              f'p95 {results[label]["p95_ms"]} мс, '
+              f'{results[label]["rps"]} рендеров/с')
+
+    speedup = results['default']['mean_ms'] / results['production']['mean_ms']
+    print(f'Ускорение: x{speedup:.1f}')
+    save_results(args.output, vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
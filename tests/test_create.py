@@ -15,7 +15,7 @@ class TestCreateView:
             response = user_client.get('/create/')
         assert response.status_code != 404, 'Страница `/create/` не найдена, проверьте этот адрес в *urls.py*'
         assert 'form' in response.context, 'Проверьте, что передали форму `form` в контекст страницы `/create/`'
-        assert len(response.context['form'].fields) == 2, 'Проверьте, что в форме `form` на страницу `/create/` 2 поля'
+        assert len(response.context['form'].fields) == 3, 'Проверьте, что в форме `form` на страницу `/create/` 3 поля'
         assert 'group' in response.context['form'].fields, (
             'Проверьте, что в форме `form` на странице `/create/` есть поле `group`'
         )
@@ -35,6 +35,9 @@ class TestCreateView:
         assert response.context['form'].fields['text'].required, (
             'Проверьте, что в форме `form` на странице `/create/` поле `text` обязательно'
         )
+        assert type(response.context['form'].fields.get('image')) == forms.fields.ImageField, (
+            'Проверьте, что в форме `form` на странице `/create/` есть поле `image` типа `ImageField`'
+        )
 
     @pytest.mark.django_db(transaction=True)
     def test_create_view_post(self, user_client, user, group):
@@ -0,0 +1,71 @@
+"""Сжатие ответов gzip и brotli.
+
+brotli — необязательная зависимость: без неё ответы сжимаются только
+gzip. Потоковые компрессоры сбрасывают буфер после каждого куска, чтобы
+клиент получал уже отданную часть страницы сразу, а не в конце ответа.
+"""
+import gzip
+import io
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Порядок предпочтения, если клиент понимает несколько кодировок.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых q=0."""
+    accepted = set()
+    for item in header.split(','):
+        encoding, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(encoding.strip().lower())
+    return accepted
+
+
+def choose_encoding(header, available=ENCODINGS):
+    """Лучшая из available кодировка, которую понимает клиент, или None."""
+    accepted = accepted_encodings(header)
+    for encoding in available:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def compress(data, encoding, level=None):
+    """Сжимает байты целиком; level по умолчанию — максимальный."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if level is None else level)
+    # mtime=0: одинаковые данные дают одинаковый архив.
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0,
+                       compresslevel=9 if level is None else level) as out:
+        out.write(data)
+    return buffer.getvalue()
+
+
+def compress_stream(chunks, encoding, level):
+    """Сжимает поток кусков, отдавая сжатое после каждого куска."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            if chunk:
+                yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if chunk:
+            yield compressor.compress(chunk) + compressor.flush(
+                zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -1,8 +1,13 @@
 from datetime import datetime
 
+from django.utils.functional import SimpleLazyObject
+
 
 def year(request):
-    """Добавляет переменную с текущим годом."""
+    """Добавляет переменную с текущим годом.
+
+    Год вычисляется, только если шаблон к нему обратился.
+    """
     return {
-        'year': datetime.utcnow().year
+        'year': SimpleLazyObject(lambda: datetime.utcnow().year)
     }
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import autodiscover_modules
+
+from core import tasks
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из очереди core.Task пулом потоков. '
+            'Можно запускать несколько воркеров одновременно.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Сколько задач выполнять параллельно.'
+        )
+        parser.add_argument(
+            '--batch', type=int,
+            help='Сколько задач брать за раз; по умолчанию вдвое больше '
+                 'числа потоков.'
+        )
+        parser.add_argument(
+            '--lease', type=int, default=300,
+            help='На сколько секунд задача закрепляется за воркером. '
+                 'Задачу, не завершённую за это время, возьмёт другой.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--purge-interval', type=float, default=60 * 60,
+            help='Как часто в секундах удалять задачи, завершённые '
+                 'больше TASKS_RETENTION_DAYS дней назад.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        # Задачи регистрируются при импорте модулей tasks приложений.
+        autodiscover_modules('tasks')
+        processed = 0
+        purged_at = None
+        try:
+            while True:
+                now = time.monotonic()
+                if (purged_at is None
+                        or now - purged_at >= options['purge_interval']):
+                    tasks.purge()
+                    purged_at = now
+                count = tasks.run_pending(
+                    threads=options['threads'], batch=options['batch'],
+                    lease=options['lease'])
+                processed += count
+                if not count:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано задач: {processed}.'))
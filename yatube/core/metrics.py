@@ -0,0 +1,106 @@
+"""Замеры отдельных запросов и их агрегаты по представлениям.
+
+RequestMetrics собирает число SQL-запросов, время в базе и в шаблонах
+для текущего запроса; MetricsRegistry копит по ним гистограммы внутри
+процесса. Текущие замеры лежат в contextvar, чтобы бэкенд шаблонов мог
+дописать в них время рендеринга, ничего не зная о middleware.
+"""
+import bisect
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+# Верхние границы корзин гистограммы полного времени запроса, мс.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.render_depth = 0
+        self.queries = Counter()
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    def record_query(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper()."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            # Параметры передаются отдельно, поэтому одинаковый текст
+            # SQL — это один и тот же шаблон запроса (кандидат в N+1).
+            self.queries[sql] += 1
+
+    def duplicates(self, threshold):
+        return {sql: count for sql, count in self.queries.items()
+                if count >= threshold}
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db_time * 1000:.2f};'
+            f'desc="{self.query_count} queries", '
+            f'tpl;dur={self.template_time * 1000:.2f}, '
+            f'total;dur={self.total * 1000:.2f}'
+        )
+
+
+class MetricsRegistry:
+    """Агрегаты по представлениям в памяти процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, metrics, duplicates):
+        total_ms = metrics.total * 1000
+        with self._lock:
+            stats = self._views.setdefault(view_name, {
+                'requests': 0,
+                'total_ms': 0.0,
+                'db_ms': 0.0,
+                'template_ms': 0.0,
+                'queries': 0,
+                'duplicate_requests': 0,
+                'histogram': [0] * (len(BUCKETS_MS) + 1),
+            })
+            stats['requests'] += 1
+            stats['total_ms'] += total_ms
+            stats['db_ms'] += metrics.db_time * 1000
+            stats['template_ms'] += metrics.template_time * 1000
+            stats['queries'] += metrics.query_count
+            stats['duplicate_requests'] += bool(duplicates)
+            stats['histogram'][bisect.bisect_left(BUCKETS_MS, total_ms)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            views = {name: dict(stats, histogram=list(stats['histogram']))
+                     for name, stats in self._views.items()}
+        for stats in views.values():
+            requests = stats['requests']
+            stats['mean_ms'] = round(stats['total_ms'] / requests, 3)
+            stats['mean_queries'] = round(stats['queries'] / requests, 2)
+        return {'buckets_ms': list(BUCKETS_MS) + ['inf'], 'views': views}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,174 @@
+import re
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import compression, streaming
+from .metrics import RequestMetrics, current_metrics, logger, registry
+from .ratelimit import check
+from .routers import PIN_COOKIE, RoutingState, current_routing
+
+
+class RequestMetricsMiddleware:
+    """Замеряет каждый запрос: SQL, время в базе, в шаблонах и общее.
+
+    Итог отдаётся заголовком Server-Timing и копится в
+    core.metrics.registry; повторяющиеся запросы (N+1) помечаются
+    заголовком X-Duplicate-Queries и предупреждением в лог.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = settings.REQUEST_METRICS_DUPLICATE_THRESHOLD
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        with self.measure(metrics):
+            response = self.get_response(request)
+        if response.streaming:
+            # Тело ещё не отрендерено: замер продолжается, пока ответ
+            # отдаётся, и попадает в registry и лог в конце потока.
+            # Server-Timing к этому моменту уже отправлен и описывает
+            # только работу до заголовков.
+            metrics.finish()
+            response['Server-Timing'] = metrics.server_timing()
+            response.streaming_content = streaming.reenter(
+                response.streaming_content, lambda: self.measure(metrics),
+                on_close=lambda: self.report(request, metrics))
+            return response
+        self.report(request, metrics, response)
+        return response
+
+    @contextmanager
+    def measure(self, metrics):
+        token = current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.record_query))
+                yield
+        finally:
+            current_metrics.reset(token)
+
+    def report(self, request, metrics, response=None):
+        metrics.finish()
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        duplicates = metrics.duplicates(self.threshold)
+        if duplicates:
+            for sql, count in duplicates.items():
+                logger.warning('%s: запрос выполнен %d раз: %s',
+                               view_name, count, sql)
+        if response is not None:
+            if duplicates:
+                response['X-Duplicate-Queries'] = str(len(duplicates))
+            response['Server-Timing'] = metrics.server_timing()
+        registry.record(view_name, metrics, duplicates)
+
+
+class ReplicaRoutingMiddleware:
+    """Включает чтение с реплик для GET/HEAD/OPTIONS-запросов.
+
+    Запросы с cookie закрепления читают из основной базы; запрос,
+    во время которого была запись, ставит это cookie.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        read_only = (request.method in self.SAFE_METHODS
+                     and PIN_COOKIE not in request.COOKIES)
+        state = RoutingState(read_only)
+        with self.routing(state):
+            response = self.get_response(request)
+        if response.streaming:
+            # Тело рендерится при отдаче и должно читать с той же реплики.
+            response.streaming_content = streaming.reenter(
+                response.streaming_content, lambda: self.routing(state))
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax')
+        return response
+
+    @contextmanager
+    def routing(self, state):
+        token = current_routing.set(state)
+        try:
+            yield
+        finally:
+            current_routing.reset(token)
+
+
+class RateLimitMiddleware:
+    """Проверяет лимиты @ratelimit до остальных process_view.
+
+    Стоит перед CsrfViewMiddleware, которая первой читает request.POST.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        rules = getattr(view_func, 'ratelimit_rules', None)
+        if not rules:
+            return None
+        request._ratelimit_checked = True
+        return check(request, rules)
+
+
+class CompressionMiddleware:
+    """Сжимает ответы gzip или brotli по Accept-Encoding.
+
+    Как и django.middleware.gzip.GZipMiddleware, стоит первой в
+    MIDDLEWARE, чтобы сжимать уже готовый ответ. Ответы короче
+    RESPONSE_COMPRESSION_MIN_SIZE не сжимаются: выигрыш меньше
+    накладных расходов. Потоковые ответы сжимаются по кускам.
+    """
+    COMPRESSIBLE_TYPES = re.compile(
+        r'^(text/|application/(json|javascript|xml)|image/svg\+xml)')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = settings.RESPONSE_COMPRESSION_MIN_SIZE
+        self.levels = settings.RESPONSE_COMPRESSION_LEVELS
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.has_header('Content-Encoding')
+                or not self.COMPRESSIBLE_TYPES.match(
+                    response.get('Content-Type', ''))):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        level = self.levels[encoding]
+        if response.streaming:
+            response.streaming_content = compression.compress_stream(
+                response.streaming_content, encoding, level)
+            del response['Content-Length']
+        else:
+            compressed = compression.compress(
+                response.content, encoding, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сжатое тело уже не совпадает байт в байт с несжатым.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,134 @@
+"""Ограничение частоты запросов скользящим окном в кэше.
+
+Представление помечается декоратором @ratelimit, а проверку выполняет
+RateLimitMiddleware в process_view, то есть до CsrfViewMiddleware:
+отклонённый запрос не доходит ни до разбора формы, ни до хэширования
+пароля. Без middleware ту же проверку делает сам декоратор.
+
+Окно приближённо скользящее: счётчик текущего окна плюс доля счётчика
+предыдущего, пропорциональная непрошедшей части текущего. Это два
+ключа в кэше (settings.RATELIMIT_CACHE) на правило и два-три обращения
+к нему на запрос.
+"""
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60); '100/15m' -> (100, 900)."""
+    match = RATE_RE.match(rate)
+    if match is None:
+        raise ValueError(f'Неверный формат лимита: {rate!r}')
+    limit, multiplier, unit = match.groups()
+    return int(limit), int(multiplier or 1) * PERIODS[unit]
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def key_ip(request):
+    return f'ip:{client_ip(request)}'
+
+
+def key_user(request):
+    """Пользователь, а для анонимов — их IP."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return key_ip(request)
+
+
+def key_endpoint(request):
+    """Один общий счётчик представления на всех клиентов."""
+    return 'all'
+
+
+KEYS = {'ip': key_ip, 'user': key_user, 'endpoint': key_endpoint}
+
+
+class Rule:
+
+    def __init__(self, rate, key, methods, scope):
+        self.limit, self.period = parse_rate(rate)
+        self.key = KEYS.get(key, key)
+        self.methods = frozenset(methods)
+        self.scope = scope
+
+    def hit(self, request):
+        """Учитывает запрос; возвращает None или секунды до повтора.
+
+        Отклонённые запросы тоже учитываются: клиент, который продолжает
+        ломиться, остаётся заблокированным.
+        """
+        cache = caches[settings.RATELIMIT_CACHE]
+        now = time.time()
+        window, offset = divmod(now, self.period)
+        window = int(window)
+        prefix = f'ratelimit:{self.scope}:{self.key(request)}'
+        current = f'{prefix}:{window}'
+        # Два периода: ключ ещё нужен как «предыдущий» для следующего окна.
+        if cache.add(current, 1, self.period * 2):
+            count = 1
+        else:
+            try:
+                count = cache.incr(current)
+            except ValueError:
+                # Ключ вытеснили между add и incr.
+                cache.add(current, 1, self.period * 2)
+                count = 1
+        previous = cache.get(f'{prefix}:{window - 1}', 0)
+        weight = 1 - offset / self.period
+        if previous * weight + count <= self.limit:
+            return None
+        return int(self.period - offset) + 1
+
+
+def check(request, rules):
+    """Ответ 429, если запрос превысил одно из правил."""
+    if not settings.RATELIMIT_ENABLE:
+        return None
+    for rule in rules:
+        if request.method not in rule.methods:
+            continue
+        retry_after = rule.hit(request)
+        if retry_after is not None:
+            response = HttpResponse(
+                'Слишком много запросов, попробуйте позже.',
+                status=429, content_type='text/plain; charset=utf-8')
+            response['Retry-After'] = str(retry_after)
+            return response
+    return None
+
+
+def ratelimit(rate, key='ip', methods=('POST',), scope=None):
+    """Ограничивает частоту запросов к представлению.
+
+    key — 'ip', 'user', 'endpoint' или функция request -> str; scope
+    по умолчанию — имя представления, так что лимиты разных
+    представлений не смешиваются. Декораторы можно складывать.
+    """
+    def decorator(view):
+        rule = Rule(rate, key, methods,
+                    scope or f'{view.__module__}.{view.__name__}')
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(request, '_ratelimit_checked', False):
+                request._ratelimit_checked = True
+                response = check(request, wrapper.ratelimit_rules)
+                if response is not None:
+                    return response
+            return view(request, *args, **kwargs)
+
+        wrapper.ratelimit_rules = (
+            getattr(view, 'ratelimit_rules', ()) + (rule,))
+        return wrapper
+    return decorator
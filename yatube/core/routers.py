@@ -0,0 +1,75 @@
+"""Маршрутизация чтения на реплики.
+
+ReplicaRouter отправляет чтение на одну из баз DATABASE_REPLICAS только
+внутри безопасных запросов, которые ReplicaRoutingMiddleware пометил в
+contextvar; всё остальное — записи, команды управления, тесты — идёт в
+default. Запрос, который что-то записал, закрепляет пользователя за
+основной базой cookie на REPLICA_PIN_SECONDS, чтобы автор сразу видел
+свой пост, даже если реплика ещё не догнала основную базу.
+
+Чтения, результат которых уходит в общий кэш (счётчики, таймлайны,
+соответствие поста автору и группе для ETag, фрагменты {% cache %}
+лент), выполняются внутри primary() и идут в default. Иначе отставшая
+реплика записала бы старые данные под версию, которую только что
+увеличила запись, и все читатели видели бы их до истечения кэша, а не
+доли секунды, пока реплика догоняет основную базу.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = 'default'
+PIN_COOKIE = 'pin_primary'
+
+current_routing = ContextVar('current_routing', default=None)
+
+
+class RoutingState:
+
+    def __init__(self, read_only):
+        self.read_only = read_only
+        self.wrote = False
+        self.replica = None
+
+    def replica_alias(self):
+        # Одна реплика на весь запрос: страница видит согласованный срез.
+        if self.replica is None:
+            self.replica = random.choice(settings.DATABASE_REPLICAS)
+        return self.replica
+
+
+@contextmanager
+def primary():
+    """Чтение внутри блока идёт в основную базу: для заполнения кэша."""
+    state = current_routing.get()
+    if state is None:
+        yield
+        return
+    read_only, state.read_only = state.read_only, False
+    try:
+        yield
+    finally:
+        state.read_only = read_only
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = current_routing.get()
+        if (state is None or not state.read_only or state.wrote
+                or not settings.DATABASE_REPLICAS):
+            return PRIMARY
+        return state.replica_alias()
+
+    def db_for_write(self, model, **hints):
+        state = current_routing.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Все базы проекта — копии основной: объект, прочитанный с
+        # реплики, можно связывать с объектом из default.
+        return True
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# PRAGMA, значение которых хранится в самом файле базы: их достаточно
+# выполнить один раз на файл за время жизни процесса.
+PERSISTENT_PRAGMAS = {'journal_mode'}
+
+_persisted = set()
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение с SQLite по SQLITE_PRAGMAS.
+
+    PRAGMA уходят одним executescript прямо в соединение sqlite3, мимо
+    курсоров Django: это настройка соединения, а не SQL запроса, и в
+    замеры RequestMetrics она не попадает.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    name = connection.settings_dict['NAME']
+    pragmas = {
+        key: value for key, value in settings.SQLITE_PRAGMAS.items()
+        if key not in PERSISTENT_PRAGMAS
+        or (name, key, value) not in _persisted
+    }
+    connection.connection.executescript(''.join(
+        f'PRAGMA {key} = {value};' for key, value in pragmas.items()))
+    _persisted.update((name, key, value) for key, value in pragmas.items()
+                      if key in PERSISTENT_PRAGMAS)
@@ -0,0 +1,160 @@
+"""Сборка и раздача статики без отдельного веб-сервера.
+
+collectstatic с CompressedManifestStaticFilesStorage кладёт в
+STATIC_ROOT файлы с хэшем содержимого в имени (css/bootstrap.min.css ->
+css/bootstrap.min.1a2b3c4d5e6f.css) и рядом сжатые копии .gz и, если
+установлен brotli, .br. {% static %} сам подставляет хэшированные имена
+из манифеста staticfiles.json.
+
+StaticFiles — WSGI-обёртка над приложением Django, которая отдаёт эти
+файлы до Django: выбирает сжатую копию по Accept-Encoding, отвечает 304
+на If-None-Match, а файлы с хэшем в имени помечает как immutable на год.
+Список файлов читается один раз при старте, поэтому после collectstatic
+процесс нужно перезапустить. URL запроса — это SCRIPT_NAME + PATH_INFO:
+при развёртывании под префиксом STATIC_URL должен его включать.
+"""
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.utils.http import parse_etags
+
+from . import compression
+
+# Сжимать имеет смысл только текст; картинки (кроме ico) уже сжаты.
+COMPRESSIBLE = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.xml',
+                '.html', '.ico')
+# Копия, которая выигрывает меньше 5 %, не стоит лишнего файла.
+MIN_RATIO = 0.95
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Файлы без хэша в имени могут поменяться при следующей сборке.
+MAX_AGE = 'public, max-age=60'
+BLOCK_SIZE = 64 * 1024
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def compress(path):
+    """Пишет path.gz и path.br, если они заметно меньше исходника."""
+    if not path.endswith(COMPRESSIBLE):
+        return []
+    with open(path, 'rb') as source:
+        data = source.read()
+    written = []
+    for encoding in compression.ENCODINGS:
+        compressed = compression.compress(data, encoding)
+        if len(compressed) < len(data) * MIN_RATIO:
+            with open(path + SUFFIXES[encoding], 'wb') as output:
+                output.write(compressed)
+            written.append(path + SUFFIXES[encoding])
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Манифест с хэшированными именами плюс сжатые копии файлов."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in names:
+            compress(self.path(name))
+
+
+class StaticFile:
+
+    def __init__(self, path, url, immutable):
+        self.variants = {}
+        for encoding, suffix in [('identity', '')] + list(SUFFIXES.items()):
+            if os.path.exists(path + suffix):
+                stat = os.stat(path + suffix)
+                etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+                self.variants[encoding] = (path + suffix, stat.st_size, etag)
+        content_type = mimetypes.guess_type(url)[0]
+        content_type = content_type or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type.endswith(
+                ('javascript', 'json', 'xml')):
+            content_type += '; charset=utf-8'
+        self.headers = [
+            ('Content-Type', content_type),
+            ('Cache-Control', IMMUTABLE if immutable else MAX_AGE),
+            ('Last-Modified', formatdate(os.stat(path).st_mtime,
+                                         usegmt=True)),
+        ]
+        if len(self.variants) > 1:
+            self.headers.append(('Vary', 'Accept-Encoding'))
+
+    def variant(self, accept_encoding):
+        available = [encoding for encoding in SUFFIXES
+                     if encoding in self.variants]
+        encoding = compression.choose_encoding(accept_encoding, available)
+        encoding = encoding or 'identity'
+        return encoding, self.variants[encoding]
+
+
+def not_modified(if_none_match, etag):
+    """Совпадает ли etag со списком If-None-Match (слабое сравнение)."""
+    if not if_none_match:
+        return False
+    tags = parse_etags(if_none_match)
+    return '*' in tags or any(
+        (tag[2:] if tag.startswith('W/') else tag) == etag for tag in tags)
+
+
+class StaticFiles:
+    """WSGI-обёртка, которая отдаёт собранную статику из STATIC_ROOT."""
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = root or settings.STATIC_ROOT
+        self.prefix = prefix or settings.STATIC_URL
+        self.files = self.scan()
+
+    def scan(self):
+        """Словарь URL -> StaticFile для всех файлов STATIC_ROOT."""
+        manifest = os.path.join(self.root, 'staticfiles.json')
+        hashed = set()
+        if os.path.exists(manifest):
+            with open(manifest, encoding='utf-8') as source:
+                hashed = set(json.load(source).get('paths', {}).values())
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, self.root).replace(
+                    os.sep, '/')
+                url = self.prefix + relative
+                files[url] = StaticFile(path, url, relative in hashed)
+        return files
+
+    def __call__(self, environ, start_response):
+        url = environ.get('SCRIPT_NAME', '') + environ.get('PATH_INFO', '')
+        static_file = self.files.get(url)
+        if static_file is None:
+            return self.application(environ, start_response)
+        method = environ['REQUEST_METHOD']
+        if method not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed',
+                           [('Allow', 'GET, HEAD'),
+                            ('Content-Length', '0')])
+            return []
+        encoding, (path, size, etag) = static_file.variant(
+            environ.get('HTTP_ACCEPT_ENCODING', ''))
+        headers = static_file.headers + [('ETag', etag)]
+        if not_modified(environ.get('HTTP_IF_NONE_MATCH'), etag):
+            start_response('304 Not Modified', headers)
+            return []
+        if encoding != 'identity':
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(size)))
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(path, 'rb'), BLOCK_SIZE)
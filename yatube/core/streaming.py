@@ -0,0 +1,56 @@
+"""Потоковый рендеринг страниц: сначала <head>, потом всё остальное.
+
+Шаблон рендерится дважды. Первый проход с head_only=True: base.html
+пропускает <body>, так что блоки с выборками из базы не выполняются, и
+клиент сразу получает <head> и начинает грузить CSS. Второй проход —
+обычный, из него отдаётся всё после </head>.
+
+Тело рендерится уже после того, как ответ прошёл все middleware,
+поэтому в потоковых страницах нельзя впервые обращаться к сессии или
+выдавать CSRF-токен: их cookie и заголовки уже не попадут в ответ.
+Middleware, которым нужно своё состояние во время рендеринга (реплики,
+замеры), возвращают его через reenter().
+"""
+from django.http import StreamingHttpResponse
+from django.template import loader
+
+HEAD_END = '</head>'
+
+
+def _after_head(html):
+    return html[html.index(HEAD_END) + len(HEAD_END):]
+
+
+def reenter(content, enter, on_close=None):
+    """Отдаёт куски content, вычисляя каждый внутри контекста enter().
+
+    on_close вызывается, когда поток закончился или клиент отключился.
+    """
+    iterator = iter(content)
+    try:
+        while True:
+            with enter():
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    return
+            yield chunk
+    finally:
+        if on_close is not None:
+            on_close()
+
+
+def render_streaming(request, template_name, context=None):
+    template = loader.get_template(template_name)
+    context = dict(context or {})
+    # Пользователь читается из сессии сейчас, пока SessionMiddleware
+    # ещё может добавить к ответу Vary: Cookie.
+    request.user.is_authenticated
+
+    def chunks():
+        head = template.render(dict(context, head_only=True), request)
+        yield head[:head.index(HEAD_END) + len(HEAD_END)]
+        yield _after_head(template.render(context, request))
+
+    return StreamingHttpResponse(chunks(),
+                                 content_type='text/html; charset=utf-8')
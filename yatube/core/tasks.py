@@ -0,0 +1,187 @@
+"""Очередь фоновых задач в базе данных.
+
+Задача — функция, помеченная @task, с аргументами, которые
+сериализуются в JSON. enqueue() только вставляет строку в core.Task,
+поэтому задача ставится в очередь в той же транзакции, что и данные,
+для которых она нужна. Выполняет задачи команда run_worker.
+
+Доставка «хотя бы один раз»: воркер берёт задачу в аренду на lease
+секунд, и если он упал или не уложился в аренду, задачу заберёт
+следующий. Поэтому задачи должны быть идемпотентными. Упавшая задача
+повторяется с экспоненциальной задержкой, пока не исчерпает
+max_attempts. Ключ идемпотентности не даёт поставить одну и ту же
+работу дважды. С TASKS_EAGER задачи выполняются сразу при enqueue().
+
+Выполненные и упавшие задачи воркер удаляет через TASKS_RETENTION_DAYS
+(см. purge). Вместе с ними уходят и их ключи: ключ защищает от повтора
+только в пределах этого срока, а упавшую задачу с тем же ключом после
+него снова можно поставить в очередь.
+"""
+import json
+import logging
+import random
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+# Задержка перед повтором: BACKOFF_BASE * 2 ** (попытка - 1) секунд,
+# но не больше BACKOFF_MAX, плюс до 10 % случайного разброса.
+BACKOFF_BASE = 2
+BACKOFF_MAX = 60 * 10
+
+registry = {}
+
+
+def task(func):
+    """Регистрирует функцию как фоновую задачу."""
+    func.task_name = f'{func.__module__}.{func.__name__}'
+    registry[func.task_name] = func
+    return func
+
+
+def enqueue(func, *, key=None, delay=0,
+            max_attempts=DEFAULT_MAX_ATTEMPTS, **kwargs):
+    """Ставит задачу в очередь; возвращает Task или None в режиме eager.
+
+    Если задача с таким key уже есть (в том числе выполненная),
+    возвращается она, а новая не создаётся.
+    """
+    payload = json.dumps(kwargs)
+    if settings.TASKS_EAGER:
+        func(**json.loads(payload))
+        return None
+    fields = {
+        'name': func.task_name,
+        'payload': payload,
+        'max_attempts': max_attempts,
+        'run_at': timezone.now() + timedelta(seconds=delay),
+    }
+    if key is None:
+        return Task.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return Task.objects.create(key=key, **fields)
+    except IntegrityError:
+        return Task.objects.get(key=key)
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * (1 + random.random() / 10)
+
+
+def _available(now):
+    # Очередная задача или задача упавшего воркера с истёкшей арендой.
+    return (Q(status=Task.QUEUED, run_at__lte=now)
+            | Q(status=Task.RUNNING, locked_until__lt=now,
+                attempts__lt=F('max_attempts')))
+
+
+def claim(limit, lease):
+    """Берёт в аренду до limit готовых задач и возвращает их id.
+
+    Каждая задача захватывается условным UPDATE, так что два воркера
+    не возьмут одну задачу даже без SELECT ... FOR UPDATE.
+    """
+    now = timezone.now()
+    # Задача, которая раз за разом роняет воркер, тоже не бесконечна.
+    Task.objects.filter(
+        status=Task.RUNNING, locked_until__lt=now,
+        attempts__gte=F('max_attempts'),
+    ).update(status=Task.FAILED, locked_until=None, finished=now,
+             last_error='Аренда истекла на последней попытке.')
+    candidates = (Task.objects.filter(_available(now))
+                  .order_by('run_at').values_list('pk', flat=True)[:limit])
+    claimed = []
+    for pk in candidates:
+        updated = Task.objects.filter(_available(now), pk=pk).update(
+            status=Task.RUNNING,
+            locked_until=now + timedelta(seconds=lease),
+            attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(pk)
+    return claimed
+
+
+def execute(pk):
+    """Выполняет взятую в аренду задачу и записывает результат."""
+    job = Task.objects.get(pk=pk)
+    func = registry.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f'Задача {job.name} не зарегистрирована.')
+        # Изменения упавшей попытки откатываются, повтор начнёт с нуля.
+        with transaction.atomic():
+            func(**json.loads(job.payload))
+    except Exception:
+        _failed(job, traceback.format_exc())
+    else:
+        Task.objects.filter(pk=pk).update(
+            status=Task.DONE, locked_until=None, finished=timezone.now(),
+            last_error='')
+
+
+def _failed(job, error):
+    now = timezone.now()
+    if job.attempts >= job.max_attempts:
+        logger.error('Задача %s (%s) не выполнена за %d попыток:\n%s',
+                     job.pk, job.name, job.attempts, error)
+        Task.objects.filter(pk=job.pk).update(
+            status=Task.FAILED, locked_until=None, finished=now,
+            last_error=error)
+        return
+    delay = backoff(job.attempts)
+    logger.warning('Задача %s (%s) упала, повтор через %.0f с:\n%s',
+                   job.pk, job.name, delay, error)
+    Task.objects.filter(pk=job.pk).update(
+        status=Task.QUEUED, locked_until=None,
+        run_at=now + timedelta(seconds=delay), last_error=error)
+
+
+def _execute_in_thread(pk):
+    try:
+        execute(pk)
+    finally:
+        # У каждого потока своё соединение с базой.
+        connection.close()
+
+
+def purge(days=None):
+    """Удаляет задачи, завершённые больше days дней назад; возвращает число.
+
+    По умолчанию days — TASKS_RETENTION_DAYS.
+    """
+    if days is None:
+        days = settings.TASKS_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Task.objects.filter(
+        status__in=(Task.DONE, Task.FAILED), finished__lt=cutoff,
+    ).delete()
+    return deleted
+
+
+def run_pending(threads=1, batch=None, lease=300):
+    """Выполняет одну пачку готовых задач и возвращает их число.
+
+    При threads=1 задачи выполняются в текущем потоке.
+    """
+    batch = batch or threads * 2
+    claimed = claim(batch, lease)
+    if threads <= 1:
+        for pk in claimed:
+            execute(pk)
+    elif claimed:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(_execute_in_thread, claimed))
+    return len(claimed)
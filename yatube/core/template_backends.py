@@ -0,0 +1,70 @@
+import time
+from pathlib import Path
+
+from django.template.backends import django as django_backend
+
+from .metrics import current_metrics
+
+
+class Template(django_backend.Template):
+    """Шаблон, который дописывает время рендеринга в замеры запроса."""
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return super().render(context, request)
+        # Вложенные рендеры (render_to_string внутри тегов) уже
+        # учтены во внешнем.
+        metrics.render_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.render_depth -= 1
+            if not metrics.render_depth:
+                metrics.template_time += time.perf_counter() - started
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return Template(template.template, self)
+
+
+def warm_templates(backends=None):
+    """Загружает все шаблоны проекта, чтобы наполнить кэширующий загрузчик.
+
+    По умолчанию прогреваются все движки из settings.TEMPLATES. Возвращает
+    число загруженных шаблонов. Синтаксическая ошибка в любом из них
+    всплывает сразу при старте, а не на первом запросе.
+    """
+    if backends is None:
+        from django.template import engines
+        backends = engines.all()
+
+    loaded = 0
+    for backend in backends:
+        if not isinstance(backend, django_backend.DjangoTemplates):
+            continue
+        for directory in _template_dirs(backend.engine.template_loaders):
+            directory = Path(directory)
+            for path in sorted(directory.rglob('*.html')):
+                name = path.relative_to(directory).as_posix()
+                backend.get_template(name)
+                loaded += 1
+    return loaded
+
+
+def _template_dirs(loaders):
+    """Каталоги шаблонов всех загрузчиков, включая вложенные в cached."""
+    dirs = []
+    for loader in loaders:
+        nested = getattr(loader, 'loaders', None)
+        found = (_template_dirs(nested) if nested is not None
+                 else loader.get_dirs())
+        dirs.extend(found)
+    return list(dict.fromkeys(dirs))
@@ -0,0 +1,38 @@
+"""Шапка и подвал для анонимов из кэша процесса.
+
+{% cached_include 'includes/header.html' %} работает как include, но
+посетителю без cookie сессии отдаёт фрагмент, отрендеренный один раз на
+процесс для каждого представления: такой посетитель заведомо аноним, и
+не нужно ни рендерить шаблон, ни обращаться к сессии за пользователем.
+Если фрагмент зависит от других переменных, их передают после имени
+шаблона — {% cached_include 'includes/footer.html' year %} — и они
+входят в ключ; остальные ленивые значения контекста не вычисляются.
+С cookie сессии фрагмент рендерится как обычно. При DEBUG кэш выключен,
+чтобы правки шаблонов были видны сразу.
+"""
+from django import template
+from django.conf import settings
+
+register = template.Library()
+
+_fragments = {}
+
+
+def clear():
+    _fragments.clear()
+
+
+@register.simple_tag(takes_context=True)
+def cached_include(context, template_name, *vary):
+    fragment = context.template.engine.get_template(template_name)
+    request = context.get('request')
+    if (settings.DEBUG or request is None
+            or settings.SESSION_COOKIE_NAME in request.COOKIES):
+        return fragment.render(context)
+    match = request.resolver_match
+    key = (template_name, match.view_name if match else None,
+           *map(str, vary))
+    html = _fragments.get(key)
+    if html is None:
+        html = _fragments[key] = fragment.render(context)
+    return html
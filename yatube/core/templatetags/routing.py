@@ -0,0 +1,29 @@
+"""Маршрутизация чтения из шаблонов.
+
+{% primary_reads %}…{% endprimary_reads %} внутри {% cache %} читает
+данные для нового фрагмента из основной базы (см. core.routers.primary):
+фрагмент живёт в кэше долго, и отставшая реплика не должна в него
+попасть. Если фрагмент уже есть в кэше, блок не рендерится вовсе.
+"""
+from django import template
+
+from core import routers
+
+register = template.Library()
+
+
+class PrimaryReadsNode(template.Node):
+
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        with routers.primary():
+            return self.nodelist.render(context)
+
+
+@register.tag
+def primary_reads(parser, token):
+    nodelist = parser.parse(('endprimary_reads',))
+    parser.delete_first_token()
+    return PrimaryReadsNode(nodelist)
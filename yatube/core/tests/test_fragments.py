@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.template import engines
+from django.test import TestCase, RequestFactory
+from django.urls import resolve, reverse
+
+from core.context_processors.year import year
+from core.templatetags import fragments
+
+User = get_user_model()
+
+
+class CachedFragmentsTests(TestCase):
+
+    def setUp(self):
+        fragments.clear()
+
+    def test_anonymous_header_is_cached(self):
+        """Аноним без cookie сессии получает шапку из кэша"""
+        url = reverse('about:author')
+        self.client.get(url)
+        key, = (key for key in fragments._fragments
+                if key[0] == 'includes/header.html')
+        self.assertEqual(key[1], 'about:author')
+        fragments._fragments[key] = '<header>из кэша</header>'
+        self.assertContains(self.client.get(url), 'из кэша')
+
+    def test_year_is_read_only_by_footer(self):
+        """Шапка из кэша не вычисляет год, подвал зависит от года"""
+        request = RequestFactory().get(reverse('about:author'))
+        request.resolver_match = resolve(request.path)
+        engine = engines.all()[0]
+        header = engine.from_string(
+            "{% load fragments %}{% cached_include 'includes/header.html' %}")
+        footer = engine.from_string(
+            "{% load fragments %}"
+            "{% cached_include 'includes/footer.html' year %}")
+        with mock.patch('core.context_processors.year.datetime') as clock:
+            clock.utcnow.return_value.year = 2030
+            for _ in range(2):
+                header.render({}, request)
+            clock.utcnow.assert_not_called()
+            self.assertIn('2030', footer.render({}, request))
+            clock.utcnow.return_value.year = 2031
+            self.assertIn('2031', footer.render({}, request))
+
+    def test_cache_depends_on_view(self):
+        """Активный пункт меню своей у каждой страницы"""
+        author = self.client.get(reverse('about:author')).content.decode()
+        tech = self.client.get(reverse('about:tech')).content.decode()
+        self.assertNotEqual(author, tech)
+        self.assertIn('active', author)
+
+    def test_logged_in_user_renders_header(self):
+        """Пользователю с сессией шапка рендерится заново"""
+        url = reverse('about:author')
+        self.client.get(url)
+        for key in list(fragments._fragments):
+            fragments._fragments[key] = 'из кэша'
+        self.client.force_login(User.objects.create_user(username='reader'))
+        response = self.client.get(url)
+        self.assertNotContains(response, 'из кэша')
+        self.assertContains(response, 'Пользователь: reader')
+
+    def test_year_is_lazy(self):
+        """Год вычисляется только при обращении из шаблона"""
+        with mock.patch('core.context_processors.year.datetime') as clock:
+            clock.utcnow.return_value.year = 2030
+            value = year(RequestFactory().get('/'))['year']
+            clock.utcnow.assert_not_called()
+            self.assertEqual(str(value), '2030')
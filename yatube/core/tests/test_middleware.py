@@ -0,0 +1,189 @@
+import gzip
+import json
+import zlib
+from unittest import mock
+
+import brotli
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.metrics import registry
+from core.middleware import CompressionMiddleware, RequestMetricsMiddleware
+from core.routers import ReplicaRouter, current_routing
+from posts.models import Post
+
+User = get_user_model()
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+
+    def setUp(self):
+        registry.reset()
+
+    def test_server_timing_header(self):
+        """Ответ содержит Server-Timing с базой, шаблонами и общим временем"""
+        response = self.client.get(reverse('posts:index'))
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'queries"', 'tpl;dur=', 'total;dur='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, timing)
+        self.assertNotIn('tpl;dur=0.00', timing)
+
+    def test_duplicate_queries_are_flagged(self):
+        """Повторяющиеся запросы помечаются как N+1"""
+        def view(request):
+            for _ in range(3):
+                User.objects.filter(pk=1).exists()
+            return HttpResponse()
+
+        middleware = RequestMetricsMiddleware(view)
+        with self.assertLogs('core.metrics', 'WARNING'):
+            response = middleware(RequestFactory().get('/'))
+        self.assertEqual(response['X-Duplicate-Queries'], '1')
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+
+    def test_metrics_endpoint_is_staff_only(self):
+        """Гистограммы доступны только персоналу"""
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('core:metrics'))
+        self.assertEqual(response.status_code, 302)
+
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        client = Client()
+        client.force_login(admin)
+        snapshot = json.loads(
+            client.get(reverse('core:metrics')).content)
+        index = snapshot['views']['posts:index']
+        self.assertEqual(index['requests'], 1)
+        self.assertEqual(sum(index['histogram']), 1)
+
+
+class CompressionMiddlewareTests(TestCase):
+
+    BODY = 'Пост ленты. ' * 500
+
+    def compress(self, response, accept='gzip, deflate, br'):
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(
+            RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept))
+
+    def test_picks_encoding_by_accept_encoding(self):
+        """Берётся brotli, если клиент его понимает, иначе gzip"""
+        response = self.compress(HttpResponse(self.BODY), 'gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content).decode(),
+                         self.BODY)
+        response = self.compress(HttpResponse(self.BODY), 'gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(),
+                         self.BODY)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']),
+                         len(response.content))
+        response = self.compress(HttpResponse(self.BODY), 'identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_skips_small_and_binary_responses(self):
+        """Короткие ответы и картинки отдаются как есть"""
+        response = self.compress(HttpResponse('коротко'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.compress(
+            HttpResponse(b'\0' * 4096, content_type='image/png'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_chunks_are_flushed(self):
+        """Каждый кусок потока можно распаковать, не дожидаясь конца"""
+        response = self.compress(StreamingHttpResponse(
+            chunk * 100 for chunk in ('<head>', '<body>')), 'gzip')
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        first = decompressor.decompress(next(response.streaming_content))
+        self.assertEqual(first, b'<head>' * 100)
+        rest = b''.join(decompressor.decompress(chunk)
+                        for chunk in response.streaming_content)
+        self.assertEqual(rest, b'<body>' * 100)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_etag_becomes_weak(self):
+        """Сжатый ответ получает слабый ETag, и 304 продолжает работать"""
+        cache.clear()
+        url = reverse('posts:index')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip',
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(POSTS_STREAMING=True)
+class StreamingRenderTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def test_head_is_sent_before_posts_are_queried(self):
+        """Потоковая лента отдаёт <head> до запроса постов"""
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Пост', author=author)
+        cache.clear()
+        response = self.client.get(reverse('posts:index'))
+        self.assertTrue(response.streaming)
+        with CaptureQueriesContext(connection) as head_queries:
+            head = next(response.streaming_content).decode()
+        self.assertTrue(head.rstrip().endswith('</head>'))
+        self.assertIn('bootstrap.min.css', head)
+        with CaptureQueriesContext(connection) as body_queries:
+            body = b''.join(response.streaming_content).decode()
+        self.assertNotIn('</head>', body)
+        self.assertIn('Пост', body)
+        posts_queries = [query for query in body_queries.captured_queries
+                         if 'posts_post' in query['sql']]
+        self.assertTrue(posts_queries)
+        self.assertFalse(head_queries.captured_queries)
+        self.assertTrue(body.rstrip().endswith('</html>'))
+
+    def test_streaming_matches_regular_page(self):
+        """Потоковая страница совпадает с обычной"""
+        User.objects.create_user(username='author')
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        cache.clear()
+        streamed = b''.join(self.client.get(url).streaming_content)
+        cache.clear()
+        with override_settings(POSTS_STREAMING=False):
+            regular = self.client.get(url).content
+        self.assertEqual(streamed, regular)
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_body_keeps_routing_and_metrics(self):
+        """Тело потока видит маршрутизацию запроса и попадает в замеры"""
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Пост в основной базе', author=author)
+        cache.clear()
+        registry.reset()
+        response = self.client.get(reverse('posts:index'))
+        self.assertIn('Server-Timing', response)
+        self.assertNotIn('posts:index', registry.snapshot()['views'])
+        states = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record_state(router, model, **hints):
+            states.append(current_routing.get())
+            return db_for_read(router, model, **hints)
+
+        with mock.patch.object(ReplicaRouter, 'db_for_read', record_state), \
+                CaptureQueriesContext(connection) as primary:
+            body = b''.join(response.streaming_content).decode()
+        # Фрагмент ленты заполняет кэш, поэтому читается из default.
+        self.assertIn('Пост в основной базе', body)
+        self.assertTrue(states)
+        self.assertNotIn(None, states)
+        stats = registry.snapshot()['views']['posts:index']
+        self.assertEqual(stats['requests'], 1)
+        self.assertGreaterEqual(stats['queries'],
+                                len(primary.captured_queries))
+        self.assertGreater(len(primary.captured_queries), 0)
+        self.assertGreater(stats['template_ms'], 0)
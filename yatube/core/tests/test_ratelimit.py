@@ -0,0 +1,82 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import TestCase, Client, RequestFactory
+from django.urls import reverse
+
+from core.ratelimit import Rule, parse_rate, ratelimit
+
+User = get_user_model()
+
+
+class RateLimitTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        """Лимит задаётся как число запросов за период"""
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('100/15m'), (100, 900))
+        with self.assertRaises(ValueError):
+            parse_rate('10 в минуту')
+
+    def test_login_throttled_before_password_check(self):
+        """Лишний вход получает 429 до проверки пароля"""
+        url = reverse('users:login')
+        data = {'username': 'nobody', 'password': 'secret'}
+        for _ in range(20):
+            self.assertEqual(self.client.post(url, data).status_code, 200)
+        with mock.patch('django.contrib.auth.forms.authenticate') as auth:
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        auth.assert_not_called()
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_post_create_limited_per_user(self):
+        """Лимит на создание постов у каждого пользователя свой"""
+        url = reverse('posts:post_create')
+        first, second = Client(), Client()
+        first.force_login(User.objects.create_user(username='first'))
+        second.force_login(User.objects.create_user(username='second'))
+        for _ in range(30):
+            first.post(url, {'text': 'Пост'})
+        self.assertEqual(first.post(url, {'text': 'Пост'}).status_code, 429)
+        self.assertEqual(second.post(url, {'text': 'Пост'}).status_code, 302)
+
+    def test_decorator_without_middleware(self):
+        """Декоратор работает и без RateLimitMiddleware"""
+        @ratelimit('2/m', methods=('GET',))
+        def view(request):
+            return HttpResponse()
+
+        factory = RequestFactory()
+        codes = [view(factory.get('/')).status_code for _ in range(3)]
+        self.assertEqual(codes, [200, 200, 429])
+
+    def test_previous_window_counts(self):
+        """Запросы прошлого окна учитываются пропорционально"""
+        rule = Rule('10/m', 'ip', ('GET',), 'test')
+        request = RequestFactory().get('/')
+        with mock.patch('core.ratelimit.time.time', return_value=6000.0):
+            for _ in range(10):
+                self.assertIsNone(rule.hit(request))
+        # Четверть нового окна: из прошлого окна засчитано 7.5 запросов.
+        with mock.patch('core.ratelimit.time.time', return_value=6075.0):
+            self.assertIsNone(rule.hit(request))
+            self.assertIsNone(rule.hit(request))
+            self.assertIsNotNone(rule.hit(request))
+
+    def test_check_is_cheap(self):
+        """Проверка лимита стоит микросекунды, а не миллисекунды"""
+        rule = Rule('1000000/m', 'ip', ('GET',), 'speed')
+        request = RequestFactory().get('/')
+        started = time.perf_counter()
+        for _ in range(1000):
+            rule.hit(request)
+        per_hit = (time.perf_counter() - started) / 1000
+        self.assertLess(per_hit, 0.001)
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import routers
+from core.routers import PIN_COOKIE, RoutingState, current_routing
+from posts import counters, timelines
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingTests(TestCase):
+    # В тестовом профиле replica — отдельная база, а не зеркало default:
+    # пост, созданный в default, на «реплике» не виден.
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='HasNoName')
+        Post.objects.create(text='Пост в основной базе', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_reads_outside_requests_use_primary(self):
+        """Вне запроса чтение идёт в основную базу"""
+        self.assertEqual(Post.objects.all().db, 'default')
+
+    def test_routing_state(self):
+        """Чтение уходит на реплику, пока в запросе не было записи"""
+        state = RoutingState(read_only=True)
+        token = current_routing.set(state)
+        try:
+            self.assertEqual(Post.objects.all().db, 'replica')
+            Post.objects.filter(pk=0).update(text='')
+            self.assertTrue(state.wrote)
+            self.assertEqual(Post.objects.all().db, 'default')
+        finally:
+            current_routing.reset(token)
+
+    def test_safe_requests_read_from_replica(self):
+        """GET-запрос читается с реплики"""
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'HasNoName'}))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_cache_fills_read_from_primary(self):
+        """Счётчики, таймлайны и фрагменты лент строятся по основной базе"""
+        # Второй запрос отдаётся из уже заполненного кэша.
+        for _ in range(2):
+            response = self.client.get(reverse('posts:index'))
+            self.assertContains(response, 'Пост в основной базе')
+        self.assertEqual(counters.get_count(counters.ALL, Post.objects), 1)
+        self.assertEqual(len(timelines.entries(counters.ALL,
+                                               Post.objects)[1]), 1)
+        state = RoutingState(read_only=True)
+        token = current_routing.set(state)
+        try:
+            with routers.primary():
+                self.assertEqual(Post.objects.all().db, 'default')
+            self.assertEqual(Post.objects.all().db, 'replica')
+        finally:
+            current_routing.reset(token)
+
+    def test_author_sees_own_post_after_write(self):
+        """После записи автор читает из основной базы по cookie"""
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('posts:post_create'),
+                                    {'text': 'Новый пост'})
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], 10)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 2)
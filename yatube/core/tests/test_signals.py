@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+from core.metrics import RequestMetrics
+
+
+class SqlitePragmasTests(SimpleTestCase):
+
+    def open_connection(self, path):
+        settings_dict = dict(connection.settings_dict, NAME=path)
+        wrapper = DatabaseWrapper(settings_dict, alias='pragmas')
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        """Новое соединение с SQLite открывается в WAL с нужными PRAGMA"""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = self.open_connection(os.path.join(directory, 'db'))
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+            # 1 — это NORMAL.
+            self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+            self.assertEqual(self.pragma(wrapper, 'cache_size'), -64 * 1024)
+            wrapper.close()
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1024})
+    def test_pragmas_from_settings(self):
+        """Набор PRAGMA берётся из настроек"""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = self.open_connection(os.path.join(directory, 'db'))
+            self.assertEqual(self.pragma(wrapper, 'cache_size'), -1024)
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+            wrapper.close()
+
+    def test_pragmas_are_not_request_queries(self):
+        """PRAGMA не видны обёрткам запросов и замерам RequestMetrics"""
+        metrics = RequestMetrics()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'db')
+            for _ in range(2):
+                settings_dict = dict(connection.settings_dict, NAME=path)
+                wrapper = DatabaseWrapper(settings_dict, alias='pragmas')
+                with wrapper.execute_wrapper(metrics.record_query):
+                    wrapper.ensure_connection()
+                self.assertEqual(self.pragma(wrapper, 'journal_mode'),
+                                 'wal')
+                self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+                wrapper.close()
+        self.assertEqual(metrics.query_count, 0)
@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import SimpleTestCase, override_settings
+
+from core.staticfiles import StaticFiles, not_modified
+
+STATIC_ROOT = tempfile.mkdtemp()
+
+
+def fallback(environ, start_response):
+    start_response('404 Not Found', [])
+    return [b'django']
+
+
+@override_settings(
+    STATIC_ROOT=STATIC_ROOT,
+    STATICFILES_STORAGE=(
+        'core.staticfiles.CompressedManifestStaticFilesStorage'),
+)
+class StaticFilesTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Статика админки только замедлила бы сборку.
+        call_command('collectstatic', interactive=False, verbosity=0,
+                     ignore_patterns=['admin'], stdout=StringIO())
+        cls.app = StaticFiles(fallback)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+
+    def get(self, path, **headers):
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, **headers}
+        result = {}
+
+        def start_response(status, headers):
+            result['status'] = status
+            result['headers'] = dict(headers)
+
+        body = b''.join(self.app(environ, start_response))
+        return result['status'], result['headers'], body
+
+    def test_collectstatic_hashes_and_compresses(self):
+        """Сборка даёт имена с хэшем и сжатые копии только для текста"""
+        url = static('css/bootstrap.min.css')
+        self.assertRegex(url, r'^/static/css/bootstrap\.min\.\w{12}\.css$')
+        path = os.path.join(STATIC_ROOT, url[len('/static/'):])
+        self.assertTrue(os.path.exists(path + '.gz'))
+        self.assertTrue(os.path.exists(path + '.br'))
+        logo = os.path.join(STATIC_ROOT, static('img/logo.png')[8:])
+        self.assertFalse(os.path.exists(logo + '.gz'))
+
+    def test_content_encoding_negotiation(self):
+        """Клиент получает лучшую из сжатых копий, которую понимает"""
+        url = static('css/bootstrap.min.css')
+        cases = (
+            ('gzip, deflate, br', 'br'),
+            ('gzip', 'gzip'),
+            ('gzip, br;q=0', 'gzip'),
+            ('', None),
+        )
+        for accept, encoding in cases:
+            with self.subTest(accept=accept):
+                status, headers, body = self.get(
+                    url, HTTP_ACCEPT_ENCODING=accept)
+                self.assertEqual(status, '200 OK')
+                self.assertEqual(headers.get('Content-Encoding'), encoding)
+                self.assertEqual(headers['Vary'], 'Accept-Encoding')
+                self.assertEqual(int(headers['Content-Length']), len(body))
+
+    def test_cache_headers(self):
+        """Файлы с хэшем неизменяемы, повторный запрос получает 304"""
+        status, headers, _ = self.get(static('img/logo.png'))
+        self.assertIn('immutable', headers['Cache-Control'])
+        status, headers, body = self.get(
+            static('img/logo.png'), HTTP_IF_NONE_MATCH=headers['ETag'])
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, b'')
+        _, headers, _ = self.get('/static/img/logo.png')
+        self.assertNotIn('immutable', headers['Cache-Control'])
+
+    def test_if_none_match_list(self):
+        """If-None-Match разбирается как список ETag, * совпадает со всем"""
+        etag = '"5f-1a"'
+        cases = (
+            ('"5f-1a"', True),
+            ('"other", W/"5f-1a"', True),
+            ('*', True),
+            ('"x5f-1a", "5f-1ab"', False),
+            ('', False),
+            (None, False),
+        )
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertIs(not_modified(header, etag), expected)
+
+    def test_script_name_prefix(self):
+        """Под префиксом SCRIPT_NAME файлы ищутся по полному пути"""
+        app = StaticFiles(fallback, prefix='/app/static/')
+        environ = {'REQUEST_METHOD': 'GET', 'SCRIPT_NAME': '/app',
+                   'PATH_INFO': static('img/logo.png')}
+        result = {}
+        body = b''.join(app(environ, lambda status, headers: result.update(
+            status=status)))
+        self.assertEqual(result['status'], '200 OK')
+        self.assertNotEqual(body, b'django')
+
+    def test_other_paths_reach_django(self):
+        """Всё, чего нет в STATIC_ROOT, отдаётся приложению"""
+        for path in ('/', '/static/missing.css'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path)[2], b'django')
+
+    def test_favicon_links(self):
+        """Фав-иконки подключены через {% static %}"""
+        response = self.client.get('/about/author/')
+        self.assertContains(response, static('img/fav/fav.ico'))
@@ -0,0 +1,110 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+
+calls = []
+
+
+@tasks.task
+def record(value):
+    calls.append(value)
+
+
+@tasks.task
+def explode():
+    raise RuntimeError('Сбой')
+
+
+@override_settings(TASKS_EAGER=False)
+class TaskQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_only_stores_task(self):
+        """enqueue() только записывает задачу, выполняет её воркер"""
+        job = tasks.enqueue(record, value=1)
+        self.assertEqual(calls, [])
+        self.assertEqual(job.status, Task.QUEUED)
+        call_command('run_worker', '--once', '--threads', '1',
+                     stdout=StringIO())
+        self.assertEqual(calls, [1])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.DONE)
+        self.assertEqual(job.attempts, 1)
+
+    def test_idempotency_key(self):
+        """Задача с тем же ключом повторно не ставится"""
+        first = tasks.enqueue(record, key='same', value=1)
+        second = tasks.enqueue(record, key='same', value=2)
+        self.assertEqual(first.pk, second.pk)
+        tasks.run_pending()
+        tasks.enqueue(record, key='same', value=3)
+        tasks.run_pending()
+        self.assertEqual(calls, [1])
+
+    def test_finished_tasks_are_purged(self):
+        """Воркер удаляет старые завершённые задачи вместе с их ключами"""
+        old = timezone.now() - timedelta(days=8)
+        done = tasks.enqueue(record, key='old', value=1)
+        failed = tasks.enqueue(explode)
+        Task.objects.filter(pk__in=(done.pk, failed.pk)).update(
+            status=Task.DONE, finished=old)
+        Task.objects.filter(pk=failed.pk).update(status=Task.FAILED)
+        recent = tasks.enqueue(record, key='recent', value=2)
+        Task.objects.filter(pk=recent.pk).update(
+            status=Task.DONE, finished=timezone.now())
+        queued = tasks.enqueue(record, delay=60 * 60, value=3)
+        with self.settings(TASKS_RETENTION_DAYS=7):
+            call_command('run_worker', '--once', '--threads', '1',
+                         stdout=StringIO())
+        self.assertEqual(set(Task.objects.values_list('pk', flat=True)),
+                         {recent.pk, queued.pk})
+        self.assertNotEqual(tasks.enqueue(record, key='old', value=1).pk,
+                            done.pk)
+
+    def test_delayed_task_waits(self):
+        """Отложенная задача не выполняется раньше срока"""
+        tasks.enqueue(record, delay=60, value=1)
+        self.assertEqual(tasks.run_pending(), 0)
+
+    def test_failed_task_retried_with_backoff(self):
+        """Упавшая задача повторяется с задержкой, затем помечается"""
+        job = tasks.enqueue(explode, max_attempts=2)
+        with self.assertLogs('core.tasks', 'WARNING'):
+            tasks.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('RuntimeError', job.last_error)
+        self.assertEqual(tasks.run_pending(), 0)
+
+        Task.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('core.tasks', 'ERROR'):
+            tasks.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_expired_lease_is_redelivered(self):
+        """Задачу воркера, не уложившегося в аренду, берёт другой"""
+        job = tasks.enqueue(record, value=1)
+        self.assertEqual(tasks.claim(10, lease=300), [job.pk])
+        self.assertEqual(tasks.claim(10, lease=300), [])
+        Task.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(tasks.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.DONE)
+        self.assertEqual(job.attempts, 2)
+
+    def test_backoff_grows(self):
+        """Задержка между попытками растёт экспоненциально"""
+        self.assertLess(tasks.backoff(1), tasks.backoff(3))
+        self.assertLessEqual(tasks.backoff(50), tasks.BACKOFF_MAX * 1.1)
@@ -0,0 +1,37 @@
+import importlib
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.template_backends import DjangoTemplates, warm_templates
+
+with mock.patch.dict(os.environ, {'DJANGO_SECRET_KEY': 'test'}):
+    settings_production = importlib.import_module('yatube.settings.prod')
+
+
+class ProductionTemplatesTests(SimpleTestCase):
+
+    def setUp(self):
+        params = dict(settings_production.TEMPLATES[0], NAME='production')
+        params.pop('BACKEND')
+        self.backend = DjangoTemplates(params)
+
+    def test_production_profile(self):
+        """Профиль production кэширует шаблоны и не включает debug"""
+        options = settings_production.TEMPLATES[0]['OPTIONS']
+        self.assertFalse(options['debug'])
+        self.assertNotIn('django.template.context_processors.debug',
+                         options['context_processors'])
+        loader, = self.backend.engine.template_loaders
+        self.assertEqual(loader.__module__, 'django.template.loaders.cached')
+
+    def test_warm_templates_fills_cache(self):
+        """Прогрев заранее компилирует шаблоны проекта и приложений"""
+        loader, = self.backend.engine.template_loaders
+        loaded = warm_templates([self.backend])
+        self.assertGreaterEqual(len(loader.get_template_cache), loaded)
+        for name in ('posts/index.html', 'base.html',
+                     'includes/header.html', 'admin/base.html'):
+            with self.subTest(name=name):
+                self.assertIn(name, loader.get_template_cache)
@@ -0,0 +1,12 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .metrics import registry
+
+
+@staff_member_required
+@require_GET
+def metrics(request):
+    """Гистограммы времени ответа по представлениям этого процесса."""
+    return JsonResponse(registry.snapshot())
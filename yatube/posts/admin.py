@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Post, Group
+from . import search
+from .models import Follow, Post, Group
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,6 +11,16 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по полнотекстовому индексу вместо LIKE '%…%'."""
+        if not search_term or not search.is_supported():
+            return super().get_search_results(
+                request, queryset, search_term)
+        if search.build_match(search_term) is None:
+            return queryset.none(), False
+        return queryset.filter(pk__in=search.matching_ids(search_term)), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
+admin.site.register(Follow)
@@ -0,0 +1,121 @@
+"""JSON-API для чтения лент и постов.
+
+Ленты листаются тем же keyset-курсором, что и HTML (posts.paginators),
+а строки выбираются через values() только с запрошенными колонками:
+?fields=id,text выбирает два поля и обходится без JOIN с автором и
+группой. Ответ сериализуется в компактный JSON без экранирования
+кириллицы.
+"""
+from django.http import JsonResponse
+
+from .paginators import (
+    BACKWARD, FORWARD, CursorPaginator, InvalidCursor, encode_position
+)
+
+# Поле ответа -> колонка для values().
+FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+# Без них не собрать курсор, поэтому они выбираются всегда.
+KEY_COLUMNS = ('id', 'pub_date')
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={
+        'ensure_ascii': False, 'separators': (',', ':')})
+
+
+def error(message, status=400):
+    return json_response({'detail': message}, status=status)
+
+
+def parse_fields(value):
+    """Кортеж полей из ?fields=; без параметра — все поля."""
+    if not value:
+        return tuple(FIELDS)
+    names = tuple(dict.fromkeys(
+        name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in names if name not in FIELDS]
+    if unknown or not names:
+        raise BadRequest(f'Неизвестные поля: {", ".join(unknown)}. '
+                         f'Доступны: {", ".join(FIELDS)}.')
+    return names
+
+
+def parse_limit(value):
+    if not value:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(f'limit должен быть от 1 до {MAX_LIMIT}.')
+    return limit
+
+
+def select(posts, fields):
+    """values()-запрос только с колонками полей fields."""
+    columns = list(KEY_COLUMNS)
+    columns += [FIELDS[name] for name in fields
+                if FIELDS[name] not in KEY_COLUMNS]
+    return posts.values(*columns)
+
+
+def serialize(row, fields):
+    item = {}
+    for name in fields:
+        value = row[FIELDS[name]]
+        if name == 'pub_date':
+            value = value.isoformat()
+        item[name] = value
+    return item
+
+
+def feed_response(request, posts, count_scope):
+    """Страница ленты posts по ?cursor=, ?limit= и ?fields=."""
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+        limit = parse_limit(request.GET.get('limit'))
+        paginator = CursorPaginator(select(posts, fields), limit,
+                                    count_scope)
+        rows, has_next, has_previous = paginator.fetch(
+            request.GET.get('cursor') or None)
+    except BadRequest as exc:
+        return error(str(exc))
+    except InvalidCursor:
+        return error('Неверный курсор.')
+    next_cursor = previous_cursor = None
+    if rows and has_next:
+        next_cursor = encode_position(
+            rows[-1]['pub_date'], rows[-1]['id'], FORWARD)
+    if rows and has_previous:
+        previous_cursor = encode_position(
+            rows[0]['pub_date'], rows[0]['id'], BACKWARD)
+    return json_response({
+        'results': [serialize(row, fields) for row in rows],
+        'next': next_cursor,
+        'previous': previous_cursor,
+    })
+
+
+def post_response(request, posts):
+    """Один пост из posts (уже отфильтрованных по id) или 404."""
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+    except BadRequest as exc:
+        return error(str(exc))
+    row = select(posts, fields).first()
+    if row is None:
+        return error('Запись не найдена.', status=404)
+    return json_response(serialize(row, fields))
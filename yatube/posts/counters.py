@@ -0,0 +1,100 @@
+"""Кэшированные счётчики постов по областям ленты.
+
+Область (scope) — это 'all', 'group:<id>' или 'author:<id>'. Значение
+считается через COUNT(*) только при промахе кэша, дальше его поддерживают
+сигналы создания, редактирования и удаления постов.
+
+Запись, пришедшая во время подсчёта, может не попасть в COUNT(*), а её
+инкремент пропадёт: счётчика в кэше ещё нет. Такая запись оставляет
+отметку, и значение, посчитанное одновременно с ней, живёт в кэше лишь
+RACE_TIMEOUT. Окно остаётся только между неудачным incr и установкой
+отметки — это пара обращений к кэшу, а не весь COUNT(*).
+"""
+import uuid
+
+from django.core.cache import cache
+
+from core import routers
+
+# Страховка от расхождений (bulk_create, правки в обход ORM):
+# счётчик в любом случае будет пересчитан не реже раза в час.
+COUNT_TIMEOUT = 60 * 60
+# Сколько живёт значение, посчитанное одновременно с записью.
+RACE_TIMEOUT = 10
+
+ALL = 'all'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def post_scopes(post):
+    scopes = [ALL, author_scope(post.author_id)]
+    if post.group_id is not None:
+        scopes.append(group_scope(post.group_id))
+    return scopes
+
+
+def _key(scope):
+    return f'posts:count:{scope}'
+
+
+def _writes_key(scope):
+    return f'posts:count-writes:{scope}'
+
+
+def write_marks(scopes):
+    """Отметки записей областей; читаются до подсчёта для remember()."""
+    keys = {_writes_key(scope): scope for scope in scopes}
+    return {keys[key]: mark
+            for key, mark in cache.get_many(list(keys)).items()}
+
+
+def get_count(scope, queryset):
+    """Число постов в области; при промахе считает его по queryset."""
+    count = cache.get(_key(scope))
+    if count is None:
+        mark = cache.get(_writes_key(scope))
+        with routers.primary():
+            count = queryset.count()
+        remember(scope, count, mark)
+    return count
+
+
+def get_cached(scopes):
+    """Уже посчитанные значения областей одним обращением к кэшу."""
+    keys = {_key(scope): scope for scope in scopes}
+    return {keys[key]: count
+            for key, count in cache.get_many(list(keys)).items()}
+
+
+def remember(scope, count, mark=None):
+    """Кладёт в кэш count, посчитанный по базе.
+
+    mark — отметка записей области, прочитанная до подсчёта.
+    """
+    # add, а не set: не затираем значение, которое уже положил и,
+    # возможно, успел увеличить другой процесс.
+    key = _key(scope)
+    cache.add(key, count, COUNT_TIMEOUT)
+    if cache.get(_writes_key(scope)) != mark:
+        # Во время подсчёта была запись, которую COUNT(*) мог не увидеть.
+        cache.touch(key, RACE_TIMEOUT)
+
+
+def adjust(scope, delta):
+    try:
+        cache.incr(_key(scope), delta)
+    except ValueError:
+        # Счётчика нет в кэше — он будет посчитан при первом чтении.
+        # Если его как раз считают, отметка сократит жизнь результата.
+        cache.set(_writes_key(scope), uuid.uuid4().hex, COUNT_TIMEOUT)
+
+
+def forget(scope):
+    cache.delete(_key(scope))
@@ -0,0 +1,80 @@
+"""ETag для условных GET-запросов к лентам и странице поста.
+
+ETag собирается из версий областей (posts.feed_cache), поэтому для
+ответа 304 не нужно ни выбирать посты, ни рендерить шаблон. Автор и
+группа поста кэшируются, запись сбрасывает posts.signals. slug и
+username ищутся в базе каждый раз: это один запрос по индексу, а
+кэш ответил бы старым id после удаления или переименования, и клиент
+со старым ETag получил бы 304 вместо 404.
+"""
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from core import routers
+
+from . import counters, feed_cache
+from .models import Group, Post
+
+User = get_user_model()
+
+LOOKUP_TIMEOUT = 60 * 60
+
+
+def post_lookup_key(post_id):
+    return f'posts:etag:post:{post_id}'
+
+
+def _lookup(key, queryset):
+    value = cache.get(key)
+    if value is None:
+        with routers.primary():
+            value = queryset.first()
+        if value is not None:
+            cache.set(key, value, LOOKUP_TIMEOUT)
+    return value
+
+
+def _etag(request, *scopes):
+    # Шапка страницы зависит от пользователя, а содержимое — от страницы.
+    user = request.user.pk if request.user.is_authenticated else 0
+    versions = '-'.join(str(feed_cache.scope_version(scope))
+                        for scope in scopes)
+    raw = f'{versions}:{user}:{request.GET.urlencode()}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def index_etag(request):
+    return _etag(request, counters.ALL)
+
+
+def group_etag(request, slug):
+    group_id = (Group.objects.filter(slug=slug)
+                .values_list('pk', flat=True).first())
+    if group_id is None:
+        return None
+    return _etag(request, counters.group_scope(group_id))
+
+
+def profile_etag(request, username):
+    author_id = (User.objects.filter(username=username)
+                 .values_list('pk', flat=True).first())
+    if author_id is None:
+        return None
+    return _etag(request, counters.author_scope(author_id))
+
+
+def post_etag(request, post_id):
+    row = _lookup(
+        post_lookup_key(post_id),
+        Post.objects.filter(pk=post_id).values_list('author_id', 'group_id'))
+    if row is None:
+        return None
+    author_id, group_id = row
+    # Счётчик постов автора и название группы тоже есть на странице.
+    scopes = [feed_cache.post_scope(post_id),
+              counters.author_scope(author_id)]
+    if group_id is not None:
+        scopes.append(counters.group_scope(group_id))
+    return _etag(request, *scopes)
@@ -0,0 +1,93 @@
+"""Потоковая выгрузка постов в JSONL и CSV.
+
+Посты читаются keyset-пачками по id (WHERE id > последний id LIMIT n),
+поэтому память не зависит от размера таблицы, а каждая пачка — быстрый
+проход по первичному ключу без OFFSET.
+"""
+import csv
+import json
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Post
+
+FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+FORMATS = ('jsonl', 'csv')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def parse_bound(value):
+    """Дата или дата-время из фильтра; наивные значения считаются в TZ."""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Неверная дата: {value}')
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_rows(group=None, author=None, since=None, until=None,
+                batch_size=2000):
+    """Кортежи FIELDS для постов, подходящих под фильтры, по порядку id."""
+    posts = Post.objects.order_by('pk').values_list(
+        'pk', 'text', 'pub_date', 'author__username', 'group__slug')
+    if group:
+        posts = posts.filter(group__slug=group)
+    if author:
+        posts = posts.filter(author__username=author)
+    if since:
+        posts = posts.filter(pub_date__gte=since)
+    if until:
+        posts = posts.filter(pub_date__lt=until)
+    last_pk = 0
+    while True:
+        count = 0
+        for row in posts.filter(pk__gt=last_pk)[:batch_size].iterator(
+                chunk_size=batch_size):
+            count += 1
+            last_pk = row[0]
+            yield row
+        if count < batch_size:
+            return
+
+
+def _jsonl(rows):
+    for pk, text, pub_date, author, group in rows:
+        yield json.dumps({
+            'id': pk,
+            'text': text,
+            'pub_date': pub_date.isoformat(),
+            'author': author,
+            'group': group,
+        }, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """Буфер для csv.writer, который сразу отдаёт записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def _csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for pk, text, pub_date, author, group in rows:
+        yield writer.writerow(
+            (pk, text, pub_date.isoformat(), author, group or ''))
+
+
+def export_lines(fmt, **filters):
+    """Строки выгрузки в формате fmt для StreamingHttpResponse или файла."""
+    rows = export_rows(**filters)
+    return _csv(rows) if fmt == 'csv' else _jsonl(rows)
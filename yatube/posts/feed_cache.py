@@ -0,0 +1,53 @@
+"""Версии областей ленты для кэширования отрендеренных страниц.
+
+У каждой области (см. posts.counters) есть номер версии. Он входит
+в ключ фрагмента страницы, поэтому для сброса кэша области достаточно
+увеличить её версию: старые фрагменты просто перестают читаться и
+вытесняются бэкендом, остальные области не затрагиваются.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def post_scope(post_id):
+    """Область отдельного поста: его страница в ленты не входит."""
+    return f'post:{post_id}'
+
+
+def _key(scope):
+    return f'posts:version:{scope}'
+
+
+def _initial_version():
+    # Версия от текущего времени не повторит номер, который мог
+    # остаться в чужих ключах после вытеснения счётчика из кэша.
+    return int(time.time() * 1000)
+
+
+def scope_version(scope):
+    return cache.get_or_set(_key(scope), _initial_version, None)
+
+
+def invalidate(*scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_key(scope))
+        except ValueError:
+            # Версии нет — при следующем чтении она начнётся заново.
+            pass
+
+
+def fragment_context(request, scope):
+    """Контекст для {% cache %} вокруг списка постов в шаблоне ленты.
+
+    Ключ состоит из области, её версии, режима пагинации и страницы.
+    """
+    page = request.GET.get('cursor') or request.GET.get('page') or '1'
+    version = scope_version(scope)
+    return {
+        'feed_cache_key': (
+            f'{scope}:{version}:{settings.POSTS_PAGINATION}:{page}'),
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
+    }
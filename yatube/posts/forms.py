@@ -1,9 +1,34 @@
 # forms.py
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
+
 from .models import Post
 
+# Форматы, которые умеют и браузеры, и sorl-thumbnail.
+IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
+
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        # Атрибут image есть только у только что загруженного файла:
+        # его уже открыл Pillow в forms.ImageField.
+        source = getattr(image, 'image', None)
+        if source is None:
+            return image
+        if image.size > settings.POST_IMAGE_MAX_SIZE:
+            raise forms.ValidationError(
+                'Картинка больше %s.'
+                % filesizeformat(settings.POST_IMAGE_MAX_SIZE))
+        if source.format not in IMAGE_FORMATS:
+            raise forms.ValidationError(
+                'Поддерживаются только JPEG, PNG, GIF и WebP.')
+        width, height = source.size
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            raise forms.ValidationError('Слишком большое разрешение.')
+        return image
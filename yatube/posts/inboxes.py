@@ -0,0 +1,148 @@
+"""Лента подписок с гибридной рассылкой (fan-out).
+
+У каждого читателя есть входящая лента — материализованная лента
+posts.timelines в области 'inbox:<id>'. Пост обычного автора при
+создании дописывается во входящие всех его подписчиков, поэтому чтение
+ленты — это срез готового списка и один запрос id__in.
+
+Рассылка постов автора с FOLLOW_FANOUT_LIMIT и более подписчиками
+обошлась бы слишком дорого, поэтому такие авторы в чужие входящие не
+пишут: их посты подмешиваются при чтении из лент самих авторов.
+Размер ленты ограничен TIMELINE_LENGTH: более старые посты в ней не
+показываются.
+"""
+import heapq
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils.functional import cached_property
+
+from core import routers
+
+from . import counters, timelines
+from .models import Follow, Post
+
+
+def inbox_scope(user_id):
+    return f'inbox:{user_id}'
+
+
+def followers_scope(author_id):
+    return f'followers:{author_id}'
+
+
+def followers_count(author_id):
+    return counters.get_count(followers_scope(author_id),
+                              Follow.objects.filter(author_id=author_id))
+
+
+def is_celebrity(author_id):
+    """Автор, которого подмешивают при чтении, а не рассылают."""
+    return followers_count(author_id) >= settings.FOLLOW_FANOUT_LIMIT
+
+
+def celebrities(author_ids):
+    """Знаменитости среди авторов: один get_many и не больше 1 запроса."""
+    scopes = {followers_scope(author_id): author_id
+              for author_id in author_ids}
+    counts = counters.get_cached(scopes)
+    missing = [author_id for scope, author_id in scopes.items()
+               if scope not in counts]
+    if missing:
+        marks = counters.write_marks(
+            followers_scope(author_id) for author_id in missing)
+        with routers.primary():
+            found = dict(Follow.objects.filter(author_id__in=missing)
+                         .values_list('author_id').annotate(Count('pk')))
+        for author_id in missing:
+            scope = followers_scope(author_id)
+            counts[scope] = found.get(author_id, 0)
+            counters.remember(scope, counts[scope], marks.get(scope))
+    return [author_id for scope, author_id in scopes.items()
+            if counts[scope] >= settings.FOLLOW_FANOUT_LIMIT]
+
+
+def _inbox_queryset(user_id):
+    # Медленный запрос по всем подпискам выполняется, только когда
+    # входящей ленты нет в кэше, и читает не больше TIMELINE_LENGTH строк.
+    return Post.objects.filter(author__following__user_id=user_id)
+
+
+def _followers(author_id):
+    return (Follow.objects.filter(author_id=author_id)
+            .values_list('user_id', flat=True).iterator())
+
+
+def fan_out(post):
+    """Дописывает новый пост во входящие подписчиков автора."""
+    if is_celebrity(post.author_id):
+        return
+    for user_id in _followers(post.author_id):
+        timelines.add(inbox_scope(user_id), post)
+
+
+def retract(post):
+    """Убирает удалённый пост из входящих подписчиков автора."""
+    if is_celebrity(post.author_id):
+        # Посты, оставшиеся во входящих, просто не найдутся при чтении.
+        return
+    for user_id in _followers(post.author_id):
+        timelines.remove(inbox_scope(user_id), post.pk)
+
+
+def forget_followers_inboxes(author_ids, batch_size=500):
+    """Сбрасывает входящие подписчиков авторов: они построятся по базе.
+
+    Для постов, добавленных в обход сигналов (импорт): рассылать их по
+    одному дороже, чем перестроить входящие при следующем чтении.
+    """
+    author_ids = list(author_ids)
+    for start in range(0, len(author_ids), batch_size):
+        user_ids = (Follow.objects
+                    .filter(author_id__in=author_ids[start:start + batch_size])
+                    .values_list('user_id', flat=True).distinct())
+        for user_id in user_ids:
+            timelines.forget(inbox_scope(user_id))
+
+
+class FollowFeed(Sequence):
+    """Лента подписок читателя для Paginator."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    @cached_property
+    def _entries(self):
+        sources = [timelines.entries(inbox_scope(self.user_id),
+                                     _inbox_queryset(self.user_id))[1]]
+        authors = Follow.objects.filter(
+            user_id=self.user_id).values_list('author_id', flat=True)
+        for author_id in celebrities(authors):
+            sources.append(timelines.entries(
+                counters.author_scope(author_id),
+                Post.objects.filter(author_id=author_id))[1])
+        if len(sources) == 1:
+            return sources[0]
+        merged = []
+        seen = set()
+        # Пост знаменитости мог попасть во входящие до того, как у автора
+        # набралось много подписчиков: повторы отбрасываем.
+        for entry in heapq.merge(*sources):
+            if entry in seen:
+                continue
+            seen.add(entry)
+            merged.append(entry)
+            if len(merged) == timelines.TIMELINE_LENGTH:
+                break
+        return merged
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        ids = [-pk for _, pk in self._entries[index]]
+        posts = Post.objects.for_feed().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+
+from posts import thumbnails
+
+
+class Command(BaseCommand):
+    help = ('Удаляет картинки, на которые не ссылается ни один пост, '
+            'и миниатюры, которых нет в хранилище sorl-thumbnail.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=60,
+            help='Не трогать файлы моложе стольких минут.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.'
+        )
+
+    def handle(self, *args, **options):
+        grace = timedelta(minutes=options['grace'])
+        dry_run = options['dry_run']
+        if not dry_run:
+            # Ссылки на уже пропавшие файлы.
+            default.kvstore.cleanup()
+        images = thumbnails.orphaned_images(grace)
+        for image in images:
+            self.stdout.write(image.name)
+            if not dry_run:
+                # Вместе с картинкой удаляются её миниатюры и ключи.
+                default.backend.delete(image)
+        orphans = thumbnails.orphaned_thumbnails(grace)
+        for thumbnail in orphans:
+            self.stdout.write(thumbnail.name)
+            if not dry_run:
+                thumbnail.delete()
+        verb = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb}: картинок {len(images)}, '
+            f'миниатюр {len(orphans)}.'))
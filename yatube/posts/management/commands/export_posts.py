@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import FORMATS, export_lines, parse_bound
+
+
+class Command(BaseCommand):
+    help = ('Выгружает посты с username автора и slug группы в JSONL или '
+            'CSV, читая таблицу keyset-пачками.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument(
+            '--output', '-o',
+            help='Файл для выгрузки; по умолчанию stdout.'
+        )
+        parser.add_argument('--group', help='Slug группы.')
+        parser.add_argument('--author', help='Username автора.')
+        parser.add_argument(
+            '--since', help='Посты, опубликованные начиная с даты.')
+        parser.add_argument(
+            '--until', help='Посты, опубликованные до даты (не включая).')
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Сколько постов читать из базы за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_bound(options['since'])
+            until = parse_bound(options['until'])
+        except ValueError as error:
+            raise CommandError(error)
+        lines = export_lines(
+            options['format'],
+            group=options['group'],
+            author=options['author'],
+            since=since,
+            until=until,
+            batch_size=options['batch_size'],
+        )
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        newline = '' if options['format'] == 'csv' else None
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline=newline) as output:
+            output.writelines(lines)
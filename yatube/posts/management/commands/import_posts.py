@@ -0,0 +1,222 @@
+import csv
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import counters, feed_cache, inboxes, timelines
+from posts.models import Group, ImportCheckpoint, Post
+
+User = get_user_model()
+
+
+@contextmanager
+def historical_pub_date():
+    """Разрешает сохранить pub_date из файла вместо auto_now_add."""
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = ('Импортирует посты из JSONL или CSV пачками через bulk_create. '
+            'Каждая запись содержит text, author (username) и, по желанию, '
+            'group (slug) и pub_date (ISO 8601). Ленты подписок читателей '
+            'затронутых авторов перестраиваются при следующем чтении, '
+            'письма подписчикам не отправляются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с постами или - для stdin.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат входных данных; по умолчанию по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов вставлять за один INSERT.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=20000,
+            help='Сколько постов фиксировать одной транзакцией.'
+        )
+        parser.add_argument(
+            '--create-authors', action='store_true',
+            help='Создавать отсутствующих авторов вместо пропуска строк.'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с контрольной точки прошлого запуска. Точка '
+                 'хранится в базе и фиксируется вместе с постами.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Имя контрольной точки; по умолчанию полный путь к файлу.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv')
+                                    else 'jsonl')
+        checkpoint = options['checkpoint']
+        if checkpoint is None and path != '-':
+            checkpoint = os.path.abspath(path)
+        if options['resume'] and checkpoint is None:
+            raise CommandError('Для --resume из stdin укажите --checkpoint.')
+
+        self.create_authors = options['create_authors']
+        self.authors = {}
+        self.unknown_authors = set()
+        self.groups = {}
+        self.touched_authors = set()
+        self.touched_groups = set()
+        self.skipped = 0
+
+        done = self.read_checkpoint(checkpoint) if options['resume'] else 0
+        imported = 0
+        started = time.monotonic()
+        with self.open_input(path) as stream:
+            records = self.parse(stream, fmt)
+            records = islice(records, done, None)
+            with historical_pub_date():
+                while True:
+                    chunk = list(islice(records, options['chunk_size']))
+                    if not chunk:
+                        break
+                    with transaction.atomic():
+                        posts = self.build_posts(chunk)
+                        Post.objects.bulk_create(
+                            posts, batch_size=options['batch_size'])
+                        self.write_checkpoint(checkpoint, done + len(chunk))
+                    done += len(chunk)
+                    imported += len(posts)
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(
+                        f'{done} строк обработано, {imported} постов '
+                        f'импортировано, {imported / elapsed:.0f} постов/с')
+
+        self.refresh_derived_data()
+        if checkpoint is not None:
+            ImportCheckpoint.objects.filter(source=checkpoint).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {imported}, пропущено строк: '
+            f'{self.skipped}.'))
+
+    @contextmanager
+    def open_input(self, path):
+        if path == '-':
+            yield sys.stdin
+            return
+        try:
+            stream = open(path, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть {path}: {error}')
+        with stream:
+            yield stream
+
+    def parse(self, stream, fmt):
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            # Битая строка всё равно занимает место в нумерации,
+            # иначе контрольная точка съедет.
+            yield record if isinstance(record, dict) else {}
+
+    def read_checkpoint(self, checkpoint):
+        return (ImportCheckpoint.objects.filter(source=checkpoint)
+                .values_list('rows', flat=True).first() or 0)
+
+    def write_checkpoint(self, checkpoint, done):
+        if checkpoint is None:
+            return
+        ImportCheckpoint.objects.update_or_create(
+            source=checkpoint, defaults={'rows': done})
+
+    def build_posts(self, chunk):
+        self.resolve_authors({row.get('author') for row in chunk})
+        self.resolve_groups({row.get('group') for row in chunk})
+        now = timezone.now()
+        posts = []
+        for row in chunk:
+            text = row.get('text')
+            author_id = self.authors.get(row.get('author'))
+            group = row.get('group') or None
+            group_id = self.groups.get(group)
+            pub_date = now
+            if row.get('pub_date'):
+                pub_date = self.parse_date(row['pub_date'])
+            if (not text or author_id is None or pub_date is None
+                    or (group is not None and group_id is None)):
+                self.skipped += 1
+                continue
+            self.touched_authors.add(author_id)
+            if group_id is not None:
+                self.touched_groups.add(group_id)
+            posts.append(Post(text=text, author_id=author_id,
+                              group_id=group_id, pub_date=pub_date))
+        return posts
+
+    def parse_date(self, value):
+        try:
+            pub_date = parse_datetime(value)
+        except ValueError:
+            return None
+        if pub_date is not None and timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return pub_date
+
+    def resolve_authors(self, usernames):
+        # Неизвестных авторов не ищем повторно в каждой пачке.
+        missing = {name for name in usernames
+                   if name and name not in self.authors
+                   and name not in self.unknown_authors}
+        if not missing:
+            return
+        self.authors.update(User.objects.filter(username__in=missing)
+                            .values_list('username', 'pk'))
+        missing -= self.authors.keys()
+        if missing and self.create_authors:
+            for username in missing:
+                self.authors[username] = User.objects.create_user(
+                    username=username).pk
+        else:
+            self.unknown_authors |= missing
+
+    def resolve_groups(self, slugs):
+        missing = {slug for slug in slugs if slug and slug not in self.groups}
+        if missing:
+            self.groups.update(Group.objects.filter(slug__in=missing)
+                               .values_list('slug', 'pk'))
+
+    def refresh_derived_data(self):
+        """bulk_create не шлёт сигналы: обновляем производные данные."""
+        if not self.touched_authors:
+            return
+        call_command('rebuild_author_stats', stdout=self.stdout)
+        scopes = [counters.ALL]
+        scopes += [counters.author_scope(pk) for pk in self.touched_authors]
+        scopes += [counters.group_scope(pk) for pk in self.touched_groups]
+        for scope in scopes:
+            counters.forget(scope)
+            timelines.forget(scope)
+        feed_cache.invalidate(*scopes)
+        inboxes.forget_followers_inboxes(self.touched_authors)
@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import AuthorStats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику авторов по таблице постов с нуля.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько строк статистики вставлять за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        authors = (User.objects.annotate(posts_count=Count('posts'))
+                   .values_list('pk', 'posts_count').order_by())
+        with transaction.atomic():
+            AuthorStats.objects.all().delete()
+            stats = AuthorStats.objects.bulk_create(
+                (AuthorStats(author_id=pk, posts_count=posts_count)
+                 for pk, posts_count in authors.iterator()),
+                batch_size=options['batch_size']
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Статистика пересчитана для {len(stats)} авторов.'))
@@ -17,11 +17,34 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    # Колонки, которые реально читают шаблоны лент.
+    FEED_FIELDS = (
+        'text', 'pub_date', 'author_id', 'group_id', 'image',
+        'author__username', 'author__first_name', 'author__last_name',
+        'group__slug',
+    )
+
+    def for_feed(self):
+        """Посты для лент вместе с автором и группой одним запросом."""
+        return (self.select_related('author', 'group')
+                .only(*self.FEED_FIELDS))
+
+
 class Post(models.Model):
     class Meta:
         verbose_name = 'Запись'
         verbose_name_plural = 'Записи'
-        ordering = ('-pub_date',)
+        # id разрешает совпадения pub_date и совпадает с порядком индексов.
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(fields=('-pub_date', '-id'),
+                         name='post_feed_idx'),
+            models.Index(fields=('group', '-pub_date', '-id'),
+                         name='post_group_feed_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_feed_idx'),
+        )
 
     text = models.TextField(verbose_name='Текст', help_text='Текст поста')
     pub_date = models.DateTimeField(auto_now_add=True,
@@ -41,6 +64,90 @@ class Post(models.Model):
                                verbose_name='Сообщество',
                                help_text=('Группа, к которой '
                                           'будет относиться пост')))
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         return self.text[:15]
+
+
+class AuthorStats(models.Model):
+    """Денормализованная статистика автора для страницы поста."""
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов'
+    )
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    """Подписка читателя на автора."""
+    class Meta:
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'author'),
+                                    name='unique_follow'),
+        )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+
+class ImportCheckpoint(models.Model):
+    """Сколько строк источника уже импортировано командой import_posts.
+
+    Хранится в базе и обновляется в одной транзакции с вставкой постов,
+    поэтому после падения --resume не повторяет зафиксированные строки.
+    """
+    class Meta:
+        verbose_name = 'Контрольная точка импорта'
+        verbose_name_plural = 'Контрольные точки импорта'
+
+    source = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Источник'
+    )
+    rows = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Обработано строк'
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Обновлено'
+    )
+
+    def __str__(self):
+        return f'{self.source}: {self.rows}'
@@ -0,0 +1,214 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
+from django.core.paginator import Page, Paginator
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from . import counters
+
+# Направление перехода, зашитое в курсор.
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_position(pub_date, pk, direction):
+    """Упаковывает позицию (pub_date, id) в строку для ?cursor=."""
+    raw = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def encode_cursor(post, direction):
+    return encode_position(post.pub_date, post.pk, direction)
+
+
+def decode_cursor(cursor):
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(cursor + padding).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+    if direction not in (FORWARD, BACKWARD) or pub_date is None:
+        raise InvalidCursor(cursor)
+    return direction, pub_date, pk
+
+
+class WindowPage(Page):
+    """Страница, которая знает окно номеров для навигации."""
+
+    @cached_property
+    def page_window(self):
+        return list(self.paginator.get_elided_page_range(self.number))
+
+
+class WindowPaginator(Paginator):
+    """Paginator с ограниченным окном номеров страниц.
+
+    Вместо всего page_range шаблон выводит первую и последнюю страницы,
+    on_each_side соседей текущей и многоточия между ними, так что размер
+    навигации не растёт вместе с лентой. Повторяет get_elided_page_range
+    из Django 3.2.
+    """
+    ELLIPSIS = '…'
+    on_each_side = 3
+    on_ends = 1
+
+    def _get_page(self, *args, **kwargs):
+        return WindowPage(*args, **kwargs)
+
+    def get_elided_page_range(self, number=1):
+        number = self.validate_number(number)
+        on_each_side, on_ends = self.on_each_side, self.on_ends
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < self.num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(self.num_pages - on_ends + 1,
+                             self.num_pages + 1)
+        else:
+            yield from range(number + 1, self.num_pages + 1)
+
+
+class CachedCountPaginator(WindowPaginator):
+    """Paginator, который берёт число записей из posts.counters."""
+
+    def __init__(self, object_list, per_page, count_scope, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_scope = count_scope
+
+    @cached_property
+    def count(self):
+        return counters.get_count(self.count_scope, self.object_list)
+
+
+class CursorPage(Sequence):
+    """Страница ленты, совместимая с posts/includes/paginator.html.
+
+    Строки выбираются при первом обращении, так что страница, чей
+    фрагмент уже лежит в кэше, не стоит ни одного запроса.
+    """
+
+    def __init__(self, paginator, cursor=None):
+        self.paginator = paginator
+        self.cursor = cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} posts>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @cached_property
+    def _window(self):
+        return self.paginator.fetch(self.cursor)
+
+    @property
+    def object_list(self):
+        return self._window[0]
+
+    def has_next(self):
+        return self._window[1]
+
+    def has_previous(self):
+        return self._window[2]
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next() or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[-1], FORWARD)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous() or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[0], BACKWARD)
+
+
+class CursorPaginator:
+    """Keyset-пагинация по (pub_date, id) вместо OFFSET/LIMIT.
+
+    Каждая страница выбирается одним запросом на per_page + 1 строк,
+    поэтому её стоимость не зависит от того, насколько глубоко
+    пролистана лента, и не требует COUNT(*).
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, count_scope):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.count_scope = count_scope
+
+    @cached_property
+    def count(self):
+        """Общее число записей; для навигации не используется."""
+        return counters.get_count(self.count_scope, self.object_list)
+
+    def page_queryset(self, cursor=None):
+        """Запрос на per_page + 1 строк, которым выбирается страница."""
+        posts = self.object_list
+        direction = FORWARD
+        if cursor is not None:
+            direction, pub_date, pk = decode_cursor(cursor)
+            # Условие записано как диапазон по pub_date плюс исключение
+            # хвоста с той же датой: с OR SQLite уходит в MULTI-INDEX OR
+            # и сортирует выборку целиком вместо обхода индекса ленты.
+            if direction == FORWARD:
+                posts = (posts.filter(pub_date__lte=pub_date)
+                         .exclude(pub_date=pub_date, pk__gte=pk))
+            else:
+                posts = (posts.filter(pub_date__gte=pub_date)
+                         .exclude(pub_date=pub_date, pk__lte=pk))
+        if direction == FORWARD:
+            posts = posts.order_by('-pub_date', '-pk')
+        else:
+            posts = posts.order_by('pub_date', 'pk')
+        return posts[:self.per_page + 1]
+
+    def fetch(self, cursor=None):
+        """Возвращает (строки, has_next, has_previous) для курсора."""
+        rows = list(self.page_queryset(cursor))
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if cursor is None:
+            return rows, has_more, False
+        if decode_cursor(cursor)[0] == FORWARD:
+            return rows, has_more, True
+        if not rows:
+            # Более новых записей не осталось: начинаем ленту сначала.
+            return self.fetch()
+        return rows[::-1], True, has_more
+
+    def page(self, cursor=None):
+        if cursor is not None:
+            decode_cursor(cursor)
+        return CursorPage(self, cursor)
+
+    def get_page(self, cursor=None):
+        """Как page(), но при битом курсоре отдаёт первую страницу."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
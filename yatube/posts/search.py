@@ -0,0 +1,115 @@
+"""Полнотекстовый поиск по постам.
+
+На SQLite тексты постов индексируются FTS5-таблицей posts_post_fts с
+внешним содержимым (content='posts_post'); синхронность с posts_post
+поддерживают триггеры, поэтому индекс не отстаёт даже после bulk_create
+и правок в обход ORM. На остальных СУБД поиск откатывается к icontains.
+Таблицу и триггеры создаёт миграция 0007. Миграции, которые меняют
+схему posts_post, на SQLite пересоздают таблицу вместе с триггерами и
+должны создать триггеры заново, как 0009.
+
+Русская морфология FTS5 из коробки не поддерживается, поэтому слова
+запроса проходят через лёгкий стеммер (отрезание окончаний) и ищутся
+по префиксу: «котами» находит и «кот», и «коты».
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+
+# Окончания от длинных к коротким; отрезается первое подошедшее,
+# если от слова остаётся хотя бы MIN_STEM букв.
+ENDINGS = sorted((
+    'ями', 'ами', 'иями', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими',
+    'ой', 'ей', 'ий', 'ый', 'ая', 'яя', 'ое', 'ее', 'ые', 'ие',
+    'ом', 'ем', 'ам', 'ям', 'ах', 'ях', 'ов', 'ев', 'ию', 'ия',
+    'ть', 'ла', 'ло', 'ли', 'ет', 'ут', 'ют', 'ит', 'ат', 'ят',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь',
+), key=len, reverse=True)
+MIN_STEM = 3
+WORD_RE = re.compile(r'\w+')
+
+
+def is_supported():
+    return connection.vendor == 'sqlite'
+
+
+def stem(word):
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def build_match(query):
+    """Переводит пользовательский запрос в выражение MATCH для FTS5.
+
+    Каждое слово превращается в префиксный терм в кавычках, так что
+    операторы FTS5 из пользовательского ввода не интерпретируются.
+    """
+    terms = [stem(word.lower()) for word in WORD_RE.findall(query)]
+    return ' '.join(f'"{term}"*' for term in terms) or None
+
+
+def matching_ids(query):
+    """Подзапрос с id найденных постов для фильтра pk__in."""
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (build_match(query),)
+    )
+
+
+class SearchResults:
+    """Ранжированные результаты поиска для django.core.paginator.
+
+    Paginator нужны только count() и срезы; каждый срез выбирает id
+    из индекса по bm25 и подгружает посты одним запросом для ленты.
+    """
+
+    def __init__(self, query, posts=None):
+        self.match = build_match(query)
+        self.posts = Post.objects.for_feed() if posts is None else posts
+
+    def count(self):
+        if self.match is None:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s', (self.match,))
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if self.match is None:
+            return []
+        start = index.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}), rowid DESC LIMIT %s OFFSET %s',
+                (self.match, index.stop - start, start))
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = self.posts.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query):
+    """Объект для Paginator с постами, найденными по запросу."""
+    if is_supported():
+        return SearchResults(query)
+    words = WORD_RE.findall(query)
+    if not words:
+        return Post.objects.none()
+    posts = Post.objects.for_feed()
+    for word in words:
+        posts = posts.filter(text__icontains=word)
+    return posts
@@ -0,0 +1,187 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from core.tasks import enqueue
+
+from . import counters, etags, feed_cache, inboxes, tasks, timelines
+from .models import AuthorStats, Follow, Group, Post
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_group(sender, instance, raw=False, **kwargs):
+    """Запоминает группу и картинку поста до сохранения."""
+    instance._previous_group_id = None
+    instance._previous_image = ''
+    if not raw and instance.pk is not None:
+        previous = (Post.objects.filter(pk=instance.pk)
+                    .values_list('group_id', 'image').first())
+        if previous is not None:
+            instance._previous_group_id, instance._previous_image = previous
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        for scope in counters.post_scopes(instance):
+            counters.adjust(scope, 1)
+        return
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if previous_group_id != instance.group_id:
+        if previous_group_id is not None:
+            counters.adjust(counters.group_scope(previous_group_id), -1)
+        if instance.group_id is not None:
+            counters.adjust(counters.group_scope(instance.group_id), 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    for scope in counters.post_scopes(instance):
+        counters.adjust(scope, -1)
+
+
+@receiver(post_delete, sender=Group)
+def forget_group_count(sender, instance, **kwargs):
+    counters.forget(counters.group_scope(instance.pk))
+
+
+@receiver(post_save, sender=Post)
+def update_timelines(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        timelines.add(counters.author_scope(instance.author_id), instance)
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if not created and previous_group_id == instance.group_id:
+        return
+    if previous_group_id is not None:
+        timelines.remove(counters.group_scope(previous_group_id),
+                         instance.pk)
+    if instance.group_id is not None:
+        timelines.add(counters.group_scope(instance.group_id), instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_timelines(sender, instance, **kwargs):
+    timelines.remove(counters.author_scope(instance.author_id), instance.pk)
+    if instance.group_id is not None:
+        timelines.remove(counters.group_scope(instance.group_id),
+                         instance.pk)
+
+
+def _task_key(func, post):
+    # SQLite может выдать id удалённого поста новому, поэтому в ключ
+    # идемпотентности входит и дата публикации.
+    return f'{func.task_name}:{post.pk}:{post.pub_date.timestamp()}'
+
+
+@receiver(post_save, sender=Post)
+def enqueue_post_tasks(sender, instance, created, raw=False, **kwargs):
+    """Рассылка во входящие и письма подписчикам — в фоне."""
+    if not created or raw:
+        return
+    for func in (tasks.fan_out_post, tasks.notify_followers):
+        enqueue(func, key=_task_key(func, instance), post_id=instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def enqueue_thumbnails(sender, instance, created, raw=False, **kwargs):
+    """Миниатюры новой картинки строятся в фоне, а не при рендеринге."""
+    if raw or not instance.image:
+        return
+    if getattr(instance, '_previous_image', '') == instance.image.name:
+        return
+    key = f'{tasks.make_thumbnails.task_name}:{instance.image.name}'
+    enqueue(tasks.make_thumbnails, key=key, post_id=instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def enqueue_retract_post(sender, instance, **kwargs):
+    enqueue(tasks.retract_post, key=_task_key(tasks.retract_post, instance),
+            post_id=instance.pk, author_id=instance.author_id)
+
+
+def _follow_changed(follow, delta):
+    """Подписка меняет входящие читателя и кнопку в профиле автора."""
+    counters.adjust(inboxes.followers_scope(follow.author_id), delta)
+    timelines.forget(inboxes.inbox_scope(follow.user_id))
+    feed_cache.invalidate(counters.author_scope(follow.author_id))
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _follow_changed(instance, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    _follow_changed(instance, -1)
+
+
+@receiver(pre_delete, sender=Group)
+def forget_group_timeline(sender, instance, **kwargs):
+    # Посты группы получат group=NULL через UPDATE, без сигналов.
+    timelines.forget(counters.group_scope(instance.pk))
+
+
+@receiver(post_save, sender=Post)
+def increment_author_stats(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    with transaction.atomic():
+        updated = AuthorStats.objects.filter(
+            author_id=instance.author_id
+        ).update(posts_count=F('posts_count') + 1)
+        if not updated:
+            # Первая запись о статистике автора: считаем честно,
+            # вдруг у него уже есть посты, созданные в обход сигналов.
+            AuthorStats.objects.get_or_create(
+                author_id=instance.author_id,
+                defaults={'posts_count': Post.objects.filter(
+                    author_id=instance.author_id).count()}
+            )
+
+
+@receiver(post_delete, sender=Post)
+def decrement_author_stats(sender, instance, **kwargs):
+    # Только update: при удалении автора его статистика
+    # удаляется каскадно, создавать её заново нельзя.
+    AuthorStats.objects.filter(
+        author_id=instance.author_id, posts_count__gt=0
+    ).update(posts_count=F('posts_count') - 1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    scopes = counters.post_scopes(instance)
+    scopes.append(feed_cache.post_scope(instance.pk))
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if previous_group_id not in (None, instance.group_id):
+        scopes.append(counters.group_scope(previous_group_id))
+    feed_cache.invalidate(*scopes)
+    cache.delete(etags.post_lookup_key(instance.pk))
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_group_feeds(sender, instance, raw=False, **kwargs):
+    """Ссылки на группу есть в общей ленте и в профилях её авторов."""
+    if raw:
+        return
+    author_ids = (Post.objects.filter(group_id=instance.pk)
+                  .values_list('author_id', flat=True).distinct())
+    feed_cache.invalidate(
+        counters.ALL,
+        counters.group_scope(instance.pk),
+        *(counters.author_scope(pk) for pk in author_ids)
+    )
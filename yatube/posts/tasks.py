@@ -0,0 +1,51 @@
+"""Фоновые задачи постов, которые не должны задерживать ответ."""
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mass_mail
+from django.urls import reverse
+
+from core.tasks import task
+
+from . import counters, feed_cache, inboxes, thumbnails
+from .models import Post
+
+User = get_user_model()
+
+
+@task
+def fan_out_post(post_id):
+    post = Post.objects.filter(pk=post_id).only(
+        'pub_date', 'author_id').first()
+    if post is not None:
+        inboxes.fan_out(post)
+
+
+@task
+def retract_post(post_id, author_id):
+    inboxes.retract(Post(pk=post_id, author_id=author_id))
+
+
+@task
+def notify_followers(post_id):
+    """Письмо подписчикам автора о новом посте."""
+    post = Post.objects.select_related('author').filter(pk=post_id).first()
+    if post is None:
+        return
+    recipients = (User.objects.filter(follower__author_id=post.author_id)
+                  .exclude(email='').values_list('email', flat=True))
+    subject = f'Новый пост автора {post.author.get_full_name() or post.author}'
+    body = (f'{post.text[:500]}\n\n'
+            f'{reverse("posts:post_details", args=(post.pk,))}')
+    send_mass_mail(
+        (subject, body, None, [email]) for email in recipients.iterator())
+
+
+@task
+def make_thumbnails(post_id):
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'author_id', 'group_id').first()
+    if post is None or not post.image:
+        return
+    thumbnails.generate(post.image)
+    # В закэшированных фрагментах лент пока стоит исходная картинка.
+    feed_cache.invalidate(feed_cache.post_scope(post.pk),
+                          *counters.post_scopes(post))
@@ -0,0 +1,11 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail_url(image, size):
+    """{% thumbnail_url post.image 'card' as url %} — без генерации."""
+    return thumbnails.url(image, size)
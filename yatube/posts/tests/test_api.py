@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        for i in range(15):
+            Post.objects.create(text=f'Пост {i}', author=cls.author,
+                                group=cls.group if i % 2 else None)
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, url, **params):
+        """Все страницы ленты по курсору next."""
+        pages = []
+        while True:
+            data = self.client.get(url, params).json()
+            pages.append(data['results'])
+            if data['next'] is None:
+                return pages
+            params['cursor'] = data['next']
+
+    def test_index_keyset_pages(self):
+        """Лента листается курсором без пропусков и повторов"""
+        pages = self.walk(reverse('posts:api_index'))
+        self.assertEqual([len(page) for page in pages], [10, 5])
+        texts = [item['text'] for page in pages for item in page]
+        self.assertEqual(texts, [f'Пост {i}' for i in range(14, -1, -1)])
+        self.assertEqual(pages[0][0]['author'], 'author')
+        self.assertIsNone(pages[0][0]['group'])
+        self.assertEqual(pages[0][1]['group'], 'group')
+
+    def test_previous_cursor(self):
+        """Курсор previous возвращает к предыдущей странице"""
+        url = reverse('posts:api_index')
+        first = self.client.get(url, {'limit': 5}).json()
+        second = self.client.get(
+            url, {'limit': 5, 'cursor': first['next']}).json()
+        back = self.client.get(
+            url, {'limit': 5, 'cursor': second['previous']}).json()
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(first['previous'])
+
+    def test_group_and_profile_feeds(self):
+        """Ленты сообщества и автора содержат только свои записи"""
+        group = self.walk(reverse('posts:api_group_list',
+                                  kwargs={'slug': 'group'}))
+        self.assertEqual(sum(map(len, group)), 7)
+        self.assertTrue(all(item['group'] == 'group'
+                            for page in group for item in page))
+        profile = self.walk(reverse('posts:api_profile',
+                                    kwargs={'username': 'author'}))
+        self.assertEqual(sum(map(len, profile)), 15)
+        response = self.client.get(reverse(
+            'posts:api_group_list', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_sparse_fields_select_only_columns(self):
+        """?fields= ограничивает и ответ, и выбираемые колонки"""
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(reverse('posts:api_index'),
+                                   {'fields': 'id,text'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'text'})
+        sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('author_id', sql)
+
+    def test_bad_parameters(self):
+        """Неизвестное поле, limit и битый курсор дают 400"""
+        url = reverse('posts:api_index')
+        for params in ({'fields': 'id,password'}, {'limit': '1000'},
+                       {'cursor': 'не-курсор'}):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.json())
+
+    def test_post_details(self):
+        """Отдельная запись отдаётся объектом с запрошенными полями"""
+        post = Post.objects.first()
+        url = reverse('posts:api_post_details', kwargs={'post_id': post.pk})
+        self.assertEqual(self.client.get(url, {'fields': 'text'}).json(),
+                         {'text': post.text})
+        data = self.client.get(url).json()
+        self.assertEqual(data['pub_date'], post.pub_date.isoformat())
+        missing = reverse('posts:api_post_details', kwargs={'post_id': 0})
+        self.assertEqual(self.client.get(missing).status_code, 404)
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from posts import counters, feed_cache
+from posts.models import Post, Group
+
+User = get_user_model()
+
+
+class FeedCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='test-slug',
+            description='Описание'
+        )
+        cls.other_group = Group.objects.create(
+            title='Вторая группа',
+            slug='second-slug',
+            description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Текст поста',
+            author=cls.user,
+            group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_index_skips_database(self):
+        """Повторный показ главной страницы не обращается к базе"""
+        self.client.get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Текст поста')
+
+    def test_new_post_invalidates_feed(self):
+        """Новый пост сразу появляется в закэшированной ленте"""
+        self.client.get(reverse('posts:index'))
+        Post.objects.create(text='Свежий пост', author=self.user)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Свежий пост')
+
+    def test_invalidation_is_scoped(self):
+        """Правка поста сбрасывает только затронутые области"""
+        scopes = (
+            counters.ALL,
+            counters.author_scope(self.user.pk),
+            counters.group_scope(self.group.pk),
+            counters.group_scope(self.other_group.pk),
+        )
+        untouched_user = User.objects.create_user(username='Other')
+        untouched = counters.author_scope(untouched_user.pk)
+        before = {scope: feed_cache.scope_version(scope)
+                  for scope in scopes + (untouched,)}
+
+        self.post.group = self.other_group
+        self.post.save()
+
+        for scope in scopes:
+            with self.subTest(scope=scope):
+                self.assertNotEqual(feed_cache.scope_version(scope),
+                                    before[scope])
+        self.assertEqual(feed_cache.scope_version(untouched),
+                         before[untouched])
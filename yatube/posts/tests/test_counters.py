@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts import counters
+from posts.models import Post, Group
+
+User = get_user_model()
+
+
+class PostCountersTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='test-slug',
+            description='Описание'
+        )
+        cls.other_group = Group.objects.create(
+            title='Вторая группа',
+            slug='second-slug',
+            description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Текст поста',
+            author=cls.user,
+            group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Тесты меняют и удаляют пост: каждому своя копия из базы.
+        self.post = Post.objects.get(pk=PostCountersTests.post.pk)
+        self.scopes = {
+            counters.ALL: Post.objects.all(),
+            counters.author_scope(self.user.pk): self.user.posts.all(),
+            counters.group_scope(self.group.pk): self.group.posts.all(),
+            counters.group_scope(self.other_group.pk):
+                self.other_group.posts.all(),
+        }
+        for scope, queryset in self.scopes.items():
+            counters.get_count(scope, queryset)
+
+    def assertCountersMatch(self):
+        for scope, queryset in self.scopes.items():
+            with self.subTest(scope=scope):
+                with self.assertNumQueries(0):
+                    cached = counters.get_count(scope, queryset)
+                self.assertEqual(cached, queryset.count())
+
+    def test_create_updates_counters(self):
+        """Создание поста увеличивает счётчики его областей"""
+        Post.objects.create(text='Новый пост', author=self.user,
+                            group=self.group)
+        self.assertCountersMatch()
+
+    def test_group_change_moves_counter(self):
+        """Смена группы переносит пост между счётчиками групп"""
+        self.post.group = self.other_group
+        self.post.save()
+        self.assertCountersMatch()
+
+    def test_delete_updates_counters(self):
+        """Удаление поста уменьшает счётчики его областей"""
+        self.post.delete()
+        self.assertCountersMatch()
+
+    def test_feeds_do_not_count_rows(self):
+        """Ленты с прогретым счётчиком не выполняют COUNT(*)"""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:profile', kwargs={'username': 'HasNoName'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(url)
+                self.assertFalse(any('COUNT(' in query['sql']
+                                     for query in queries))
+
+    def test_write_during_count_is_not_cached_for_long(self):
+        """Счётчик, посчитанный одновременно с записью, живёт недолго"""
+        scope = counters.author_scope(self.user.pk)
+        counters.forget(scope)
+        user = self.user
+
+        class RacingQuerySet:
+            def count(self):
+                stale = user.posts.count()
+                # Пост появляется, когда COUNT(*) уже посчитан.
+                Post.objects.create(text='Пост во время подсчёта',
+                                    author=user)
+                return stale
+
+        with mock.patch.object(counters, 'RACE_TIMEOUT', 0):
+            self.assertEqual(counters.get_count(scope, RacingQuerySet()), 1)
+        self.assertEqual(counters.get_count(scope, self.user.posts.all()), 2)
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from posts.models import Post, Group
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='test-slug',
+            description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Текст поста',
+            author=cls.user,
+            group=cls.group
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:profile', kwargs={'username': 'HasNoName'}),
+            reverse('posts:post_details', kwargs={'post_id': cls.post.pk}),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_matching_etag_returns_304(self):
+        """Совпавший If-None-Match даёт 304 без рендеринга шаблона"""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.templates, [])
+
+    def test_deleted_or_renamed_author_is_not_304(self):
+        """Старый ETag профиля не даёт 304 после удаления или смены имени"""
+        for change in ('delete', 'rename'):
+            with self.subTest(change=change):
+                # Без постов: версия области автора при удалении не
+                # меняется.
+                author = User.objects.create_user(username='silent')
+                url = reverse('posts:profile', kwargs={'username': 'silent'})
+                etag = self.client.get(url)['ETag']
+                if change == 'delete':
+                    author.delete()
+                else:
+                    author.username = 'renamed'
+                    author.save()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 404)
+                User.objects.filter(pk=author.pk).delete()
+
+    def test_edit_changes_etag(self):
+        """Правка поста меняет ETag всех страниц, где он виден"""
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.post.text = 'Новый текст'
+        self.post.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        """Гость и автор получают разные ETag"""
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        url = reverse('posts:index')
+        self.assertNotEqual(self.client.get(url)['ETag'],
+                            authorized_client.get(url)['ETag'])
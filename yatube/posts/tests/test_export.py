@@ -0,0 +1,69 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ExportPostsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='test-slug',
+            description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(text=f'Пост {i}', author=cls.user,
+                                group=cls.group if i % 2 else None)
+            for i in range(5)
+        ]
+
+    def test_command_exports_jsonl_in_batches(self):
+        """export_posts выгружает все посты, читая их пачками"""
+        output = StringIO()
+        call_command('export_posts', '--batch-size', '2', stdout=output)
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([row['id'] for row in rows],
+                         [post.pk for post in self.posts])
+        self.assertEqual(rows[1]['author'], 'HasNoName')
+        self.assertEqual(rows[1]['group'], 'test-slug')
+
+    def test_command_filters(self):
+        """export_posts фильтрует по группе и дате"""
+        output = StringIO()
+        call_command('export_posts', '--group', 'test-slug',
+                     stdout=output)
+        self.assertEqual(len(output.getvalue().splitlines()), 2)
+        output = StringIO()
+        call_command('export_posts', '--until', '2000-01-01',
+                     stdout=output)
+        self.assertEqual(output.getvalue(), '')
+
+    def test_endpoint_is_staff_only(self):
+        """Выгрузка по HTTP доступна только персоналу"""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('posts:export_posts'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_endpoint_streams_csv(self):
+        """Персонал получает потоковую выгрузку в CSV"""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(reverse('posts:export_posts'),
+                              {'format': 'csv', 'author': 'HasNoName'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,text,pub_date,author,group')
+        self.assertEqual(len(lines), 6)
@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from core.models import Task
+from core.tasks import run_pending
+from posts import inboxes, timelines
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.stranger = User.objects.create_user(username='stranger')
+        Post.objects.create(text='Старый пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.stranger_client = Client()
+        self.stranger_client.force_login(self.stranger)
+
+    def follow(self):
+        self.reader_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'author'}))
+
+    def feed(self, client):
+        response = client.get(reverse('posts:follow_index'))
+        return [post.text for post in response.context['page_obj']]
+
+    def test_follow_and_unfollow(self):
+        """Читатель подписывается на автора и отписывается от него"""
+        self.follow()
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.author).exists())
+        self.reader_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': 'author'}))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_cannot_follow_self(self):
+        """Подписаться на самого себя нельзя"""
+        self.reader_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'reader'}))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_new_post_reaches_followers_only(self):
+        """Новый пост появляется в ленте подписчика и только у него"""
+        self.follow()
+        self.assertEqual(self.feed(self.reader_client), ['Старый пост'])
+        Post.objects.create(text='Новый пост', author=self.author)
+        self.assertEqual(self.feed(self.reader_client),
+                         ['Новый пост', 'Старый пост'])
+        self.assertEqual(self.feed(self.stranger_client), [])
+
+    def test_post_is_pushed_into_inbox(self):
+        """Пост обычного автора дописывается в готовые входящие"""
+        self.follow()
+        self.feed(self.reader_client)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        complete, items = cache.get(
+            timelines._key(inboxes.inbox_scope(self.reader.pk)))
+        self.assertEqual(-items[0][1], post.pk)
+        post.delete()
+        self.assertEqual(self.feed(self.reader_client), ['Старый пост'])
+
+    @override_settings(FOLLOW_FANOUT_LIMIT=1)
+    def test_celebrity_posts_merged_on_read(self):
+        """Посты автора с массой подписчиков подмешиваются при чтении"""
+        self.follow()
+        self.feed(self.reader_client)
+        self.assertTrue(inboxes.is_celebrity(self.author.pk))
+        Post.objects.create(text='Новый пост', author=self.author)
+        complete, items = cache.get(
+            timelines._key(inboxes.inbox_scope(self.reader.pk)))
+        self.assertEqual(len(items), 1)
+        self.assertEqual(self.feed(self.reader_client),
+                         ['Новый пост', 'Старый пост'])
+
+    def test_inbox_is_bounded(self):
+        """Лента подписок не длиннее TIMELINE_LENGTH"""
+        self.follow()
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.author) for i in range(5))
+        with mock.patch.object(timelines, 'TIMELINE_LENGTH', 3):
+            self.assertEqual(len(inboxes.FollowFeed(self.reader.pk)), 3)
+
+    def test_followers_notified_by_email(self):
+        """Подписчики с почтой получают письмо о новом посте"""
+        User.objects.filter(pk=self.reader.pk).update(
+            email='reader@example.com')
+        self.follow()
+        Post.objects.create(text='Новый пост', author=self.author)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['reader@example.com'])
+
+    @override_settings(TASKS_EAGER=False)
+    def test_post_create_only_enqueues_side_effects(self):
+        """Создание поста ставит рассылку в очередь и сразу отвечает"""
+        self.follow()
+        self.feed(self.reader_client)
+        author_client = Client()
+        author_client.force_login(self.author)
+        response = author_client.post(reverse('posts:post_create'),
+                                      {'text': 'Новый пост'})
+        self.assertRedirects(response, reverse(
+            'posts:profile', kwargs={'username': 'author'}))
+        self.assertEqual(Task.objects.filter(status=Task.QUEUED).count(), 2)
+        self.assertEqual(self.feed(self.reader_client), ['Старый пост'])
+        run_pending(batch=10)
+        self.assertEqual(self.feed(self.reader_client),
+                         ['Новый пост', 'Старый пост'])
@@ -0,0 +1,109 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from core.tasks import run_pending
+from posts import thumbnails
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def gif(name='small.gif'):
+    return SimpleUploadedFile(name, SMALL_GIF, content_type='image/gif')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        # База откатывается после теста, а файлы остаются: чистим их.
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def create(self, image):
+        return self.client.post(reverse('posts:post_create'),
+                                {'text': 'Пост с картинкой', 'image': image})
+
+    def image_src(self, post):
+        response = self.client.get(reverse('posts:index'))
+        return thumbnails.url(post.image, 'card'), response.content.decode()
+
+    def test_create_post_with_image(self):
+        """Картинка сохраняется, а в ленте выводится её миниатюра"""
+        self.create(gif())
+        post = Post.objects.get()
+        self.assertTrue(post.image.name.startswith('posts/small'))
+        url, content = self.image_src(post)
+        self.assertTrue(url.startswith(settings.MEDIA_URL + 'cache/'))
+        self.assertIn(f'src="{url}"', content)
+
+    def test_invalid_uploads_rejected(self):
+        """Не картинка и слишком большой файл не проходят проверку"""
+        not_image = SimpleUploadedFile('text.gif', b'not an image',
+                                       content_type='image/gif')
+        response = self.create(not_image)
+        self.assertTrue(response.context['form'].errors['image'])
+        with override_settings(POST_IMAGE_MAX_SIZE=10):
+            response = self.create(gif())
+        self.assertTrue(response.context['form'].errors['image'])
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(TASKS_EAGER=False)
+    def test_thumbnails_built_in_background(self):
+        """Пока задача не выполнена, шаблон отдаёт исходную картинку"""
+        self.create(gif())
+        post = Post.objects.get()
+        url, content = self.image_src(post)
+        self.assertEqual(url, post.image.url)
+        self.assertIn(f'src="{url}"', content)
+        run_pending(batch=10)
+        url, content = self.image_src(post)
+        self.assertNotEqual(url, post.image.url)
+        self.assertIn(f'src="{url}"', content)
+
+    def test_cleanup_orphaned_files(self):
+        """cleanup_media удаляет картинки удалённых постов и их миниатюры"""
+        self.create(gif('kept.gif'))
+        self.create(gif('deleted.gif'))
+        kept, deleted = Post.objects.order_by('pk')
+        storage = kept.image.storage
+        self.assertEqual(len(list(thumbnails._walk(storage, 'cache'))), 6)
+        deleted_name = deleted.image.name
+        deleted.delete()
+        call_command('cleanup_media', grace=0, stdout=StringIO())
+        self.assertFalse(storage.exists(deleted_name))
+        self.assertTrue(storage.exists(kept.image.name))
+        self.assertEqual(len(list(thumbnails._walk(storage, 'cache'))), 3)
+        self.assertNotEqual(thumbnails.url(kept.image, 'small'),
+                            kept.image.url)
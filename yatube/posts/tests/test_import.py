@@ -0,0 +1,137 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from posts import inboxes
+from posts.models import (AuthorStats, Follow, Group, ImportCheckpoint,
+                          Post)
+
+User = get_user_model()
+
+
+class ImportPostsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='test-slug',
+            description='Описание'
+        )
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        return path
+
+    def import_posts(self, path, *args):
+        call_command('import_posts', path, *args, stdout=StringIO())
+
+    def test_import_jsonl(self):
+        """Импорт JSONL сохраняет исторические даты и группы"""
+        rows = [
+            {'text': 'Старый пост', 'author': 'HasNoName',
+             'group': 'test-slug', 'pub_date': '2010-05-01T12:00:00Z'},
+            {'text': 'Без группы', 'author': 'HasNoName'},
+            {'text': 'Чужой автор', 'author': 'Nobody'},
+            {'text': 'Чужая группа', 'author': 'HasNoName',
+             'group': 'no-such-group'},
+        ]
+        path = self.write('posts.jsonl',
+                          '\n'.join(json.dumps(row) for row in rows))
+        self.import_posts(path, '--batch-size', '1')
+
+        self.assertEqual(Post.objects.count(), 2)
+        old = Post.objects.get(text='Старый пост')
+        self.assertEqual(old.group, self.group)
+        self.assertEqual(old.pub_date,
+                         datetime(2010, 5, 1, 12, tzinfo=timezone.utc))
+        self.assertEqual(AuthorStats.objects.get(author=self.user)
+                         .posts_count, 2)
+
+    def test_import_csv_creates_authors(self):
+        """Импорт CSV может создавать недостающих авторов"""
+        path = self.write('posts.csv',
+                          'text,author,group,pub_date\n'
+                          'Пост из CSV,newbie,test-slug,\n')
+        self.import_posts(path, '--create-authors')
+        post = Post.objects.get()
+        self.assertEqual(post.author.username, 'newbie')
+        self.assertEqual(post.group, self.group)
+
+    def test_resume_skips_imported_rows(self):
+        """Повторный запуск с --resume продолжает с контрольной точки"""
+        path = self.write('posts.jsonl', '\n'.join(
+            json.dumps({'text': f'Пост {i}', 'author': 'HasNoName'})
+            for i in range(5)))
+        ImportCheckpoint.objects.create(source=path, rows=3)
+        self.import_posts(path, '--resume')
+        self.assertEqual(
+            list(Post.objects.order_by('text')
+                 .values_list('text', flat=True)),
+            ['Пост 3', 'Пост 4'])
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    def test_checkpoint_is_committed_with_posts(self):
+        """Посты пачки не фиксируются без её контрольной точки"""
+        path = self.write('posts.jsonl', '\n'.join(
+            json.dumps({'text': f'Пост {i}', 'author': 'HasNoName'})
+            for i in range(4)))
+        save = ImportCheckpoint.objects.update_or_create
+        calls = []
+
+        def crash_on_second_chunk(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 2:
+                raise RuntimeError('падение посреди импорта')
+            return save(**kwargs)
+
+        with mock.patch.object(ImportCheckpoint.objects, 'update_or_create',
+                               side_effect=crash_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.import_posts(path, '--chunk-size', '2')
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(ImportCheckpoint.objects.get(source=path).rows, 2)
+        self.import_posts(path, '--chunk-size', '2', '--resume')
+        self.assertEqual(
+            list(Post.objects.order_by('text')
+                 .values_list('text', flat=True)),
+            ['Пост 0', 'Пост 1', 'Пост 2', 'Пост 3'])
+
+    def test_imported_posts_reach_followers(self):
+        """Импортированные посты видны в ленте подписок"""
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.user)
+        self.assertEqual(len(inboxes.FollowFeed(reader.pk)), 0)
+        path = self.write('posts.jsonl', json.dumps(
+            {'text': 'Импортированный пост', 'author': 'HasNoName'}))
+        self.import_posts(path)
+        self.assertEqual(len(inboxes.FollowFeed(reader.pk)), 1)
+
+    def test_unknown_author_looked_up_once(self):
+        """Неизвестный автор ищется в базе один раз на весь импорт"""
+        path = self.write('posts.jsonl', '\n'.join(
+            json.dumps({'text': f'Пост {i}', 'author': 'Nobody'})
+            for i in range(3)))
+        with CaptureQueriesContext(connection) as queries:
+            self.import_posts(path, '--chunk-size', '1')
+        lookups = [query for query in queries.captured_queries
+                   if "'Nobody'" in query['sql']]
+        self.assertEqual(len(lookups), 1)
+        self.assertFalse(Post.objects.exists())
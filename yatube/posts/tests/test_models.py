@@ -1,6 +1,10 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
-from ..models import Group, Post
+from django.urls import reverse
+from ..models import AuthorStats, Group, Post
 
 User = get_user_model()
 
@@ -23,3 +27,44 @@ class PostModelTest(TestCase):
     def test_models_have_correct_object_names(self):
         """Проверяем, что у моделей корректно работает __str__."""
         self.assertEqual(PostModelTest.post.__str__(), 'Тестовый пост')
+
+
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+        )
+
+    def test_stats_follow_create_and_delete(self):
+        """Статистика автора меняется при создании и удалении поста."""
+        self.assertEqual(AuthorStats.objects.get(author=self.user)
+                         .posts_count, 1)
+        post = Post.objects.create(author=self.user, text='Второй пост')
+        self.assertEqual(AuthorStats.objects.get(author=self.user)
+                         .posts_count, 2)
+        # Общий для класса self.post не удаляем: delete() обнулит его pk
+        # и для следующих тестов.
+        post.delete()
+        self.assertEqual(AuthorStats.objects.get(author=self.user)
+                         .posts_count, 1)
+
+    def test_rebuild_command(self):
+        """Команда rebuild_author_stats пересчитывает статистику."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text='Пост') for _ in range(3))
+        call_command('rebuild_author_stats', stdout=StringIO())
+        self.assertEqual(AuthorStats.objects.get(author=self.user)
+                         .posts_count, 4)
+
+    def test_post_detail_single_query(self):
+        """Страница поста получает пост и статистику одним запросом."""
+        url = reverse('posts:post_details', kwargs={'post_id': self.post.pk})
+        # Первый запрос заодно кэширует автора и группу поста для ETag.
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertContains(response, '<span >1</span>')
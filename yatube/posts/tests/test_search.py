@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+from posts.models import Post
+
+User = get_user_model()
+
+
+class PostSearchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.cats = Post.objects.create(
+            text='Коты и кошки любят спать', author=cls.user)
+        cls.dog = Post.objects.create(
+            text='Собака охраняет дом', author=cls.user)
+        cls.many_cats = Post.objects.create(
+            text='Кот, кот и ещё раз кот', author=cls.user)
+
+    def search(self, query):
+        response = self.client.get(reverse('posts:search'), {'q': query})
+        return list(response.context['page_obj'])
+
+    def test_search_matches_word_forms(self):
+        """Поиск находит посты по другим формам слова"""
+        self.assertEqual(self.search('собаками'), [self.dog])
+        self.assertCountEqual(self.search('котами'),
+                              [self.cats, self.many_cats])
+
+    def test_search_is_ranked(self):
+        """Более релевантные посты идут первыми"""
+        self.assertEqual(self.search('кот')[0], self.many_cats)
+
+    def test_index_follows_edits_and_deletes(self):
+        """Индекс обновляется при правке и удалении поста"""
+        dog = Post.objects.get(pk=self.dog.pk)
+        dog.text = 'Попугай говорит'
+        dog.save()
+        self.assertEqual(self.search('собака'), [])
+        self.assertEqual(self.search('попугай'), [dog])
+        dog.delete()
+        self.assertEqual(self.search('попугай'), [])
+
+    def test_operators_are_not_interpreted(self):
+        """Служебный синтаксис FTS5 в запросе не ломает поиск"""
+        self.assertEqual(self.search('"'), [])
+        self.assertEqual(self.search('кот OR NOT'), [])
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке находит посты через тот же индекс"""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(reverse('admin:posts_post_changelist'),
+                              {'q': 'собаками'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.dog])
@@ -0,0 +1,112 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from posts import counters, timelines
+from posts.models import Post, Group
+
+User = get_user_model()
+
+
+class GroupTimelineTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='test-slug',
+            description='Описание'
+        )
+        cls.other_group = Group.objects.create(
+            title='Вторая группа',
+            slug='second-slug',
+            description='Описание'
+        )
+        now = timezone.now()
+        # auto_now_add затирает дату при вставке, поэтому разносим
+        # посты по времени отдельным update.
+        posts = Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.user, group=cls.group)
+            for i in range(12))
+        for i, post in enumerate(posts):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(hours=i))
+
+    def setUp(self):
+        cache.clear()
+
+    def timeline_ids(self, group):
+        scope = counters.group_scope(group.pk)
+        return [post.pk for post in
+                timelines.TimelinePosts(scope, group.posts.all())[:]]
+
+    def database_ids(self, group):
+        return list(group.posts.order_by('-pub_date', '-pk')
+                    .values_list('pk', flat=True))
+
+    def test_timeline_matches_feed_order(self):
+        """Лента группы из кэша совпадает с лентой из базы"""
+        self.assertEqual(self.timeline_ids(self.group),
+                         self.database_ids(self.group))
+
+    def test_group_page_is_slice_plus_id_lookup(self):
+        """Страница группы при готовой ленте — один запрос id__in"""
+        url = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        self.client.get(url, {'page': 2})
+        scope = counters.group_scope(self.group.pk)
+        with self.assertNumQueries(1):
+            page = timelines.TimelinePosts(scope, self.group.posts.all())
+            posts = page[10:20]
+        self.assertEqual([post.pk for post in posts],
+                         self.database_ids(self.group)[10:])
+
+    def test_signals_keep_timeline_fresh(self):
+        """Создание, перенос между группами и удаление обновляют ленты"""
+        self.timeline_ids(self.group)
+        self.timeline_ids(self.other_group)
+
+        post = Post.objects.create(text='Новый пост', author=self.user,
+                                   group=self.group)
+        self.assertEqual(self.timeline_ids(self.group)[0], post.pk)
+
+        post.group = self.other_group
+        post.save()
+        self.assertNotIn(post.pk, self.timeline_ids(self.group))
+        self.assertEqual(self.timeline_ids(self.other_group), [post.pk])
+
+        old = Post.objects.filter(group=self.group).last()
+        old.delete()
+        post.delete()
+        for group in (self.group, self.other_group):
+            with self.subTest(group=group.slug):
+                self.assertEqual(self.timeline_ids(group),
+                                 self.database_ids(group))
+
+    def test_group_delete_forgets_timeline(self):
+        """Удаление группы сбрасывает её ленту"""
+        group = Group.objects.create(title='Временная', slug='temp')
+        Post.objects.create(text='Пост', author=self.user, group=group)
+        self.timeline_ids(group)
+        scope = counters.group_scope(group.pk)
+        group.delete()
+        self.assertIsNone(cache.get(timelines._key(scope)))
+
+    def test_partial_timeline_reads_tail_from_database(self):
+        """Страницы за концом неполного списка читаются из базы"""
+        with mock.patch.object(timelines, 'TIMELINE_LENGTH', 5):
+            self.assertEqual(self.timeline_ids(self.group),
+                             self.database_ids(self.group))
+            Post.objects.create(text='Новый пост', author=self.user,
+                                group=self.group)
+            complete, items = timelines.entries(
+                counters.group_scope(self.group.pk), self.group.posts.all())
+            self.assertFalse(complete)
+            self.assertEqual(len(items), 5)
+            self.assertEqual(self.timeline_ids(self.group),
+                             self.database_ids(self.group))
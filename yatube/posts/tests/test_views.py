@@ -1,8 +1,12 @@
 from django import forms
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from posts.models import Post, Group
+from posts.paginators import WindowPaginator
 
 User = get_user_model()
 
@@ -25,6 +29,7 @@ class PostPagesTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(PostPagesTests.user)
 
@@ -150,3 +155,132 @@ class PostPagesTests(TestCase):
         response = self.authorized_client.get(
             reverse('posts:group_list', kwargs={'slug': 'second-slug'}))
         self.assertEqual(len(response.context['page_obj']), 0)
+
+
+class PageWindowTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+
+    def setUp(self):
+        cache.clear()
+
+    def create_posts(self, count):
+        Post.objects.bulk_create(
+            Post(text='Пост', author=self.user) for _ in range(count))
+
+    def test_page_window(self):
+        """Окно пагинатора: края, соседи текущей страницы и многоточия"""
+        paginator = WindowPaginator(range(1000), 10)
+        cases = {
+            1: [1, 2, 3, 4, '…', 100],
+            5: [1, 2, 3, 4, 5, 6, 7, 8, '…', 100],
+            50: [1, '…', 47, 48, 49, 50, 51, 52, 53, '…', 100],
+            100: [1, '…', 97, 98, 99, 100],
+        }
+        for number, window in cases.items():
+            with self.subTest(number=number):
+                self.assertEqual(paginator.page(number).page_window, window)
+        self.assertEqual(WindowPaginator(range(50), 10).page(3).page_window,
+                         [1, 2, 3, 4, 5])
+
+    def test_response_size_does_not_grow(self):
+        """Размер страницы ленты не зависит от числа постов"""
+        url = reverse('posts:index')
+        self.create_posts(200)
+        small = self.client.get(url, {'page': 10})
+        cache.clear()
+        self.create_posts(790)
+        large = self.client.get(url, {'page': 10})
+        self.assertEqual(small.context['page_obj'].paginator.num_pages, 20)
+        self.assertEqual(large.context['page_obj'].paginator.num_pages, 99)
+        self.assertEqual(len(small.content), len(large.content))
+
+
+@override_settings(POSTS_PAGINATION='cursor')
+class CursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='HasNoName')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.user) for i in range(13))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages(self):
+        """Курсорная пагинация листает ленту вперёд и назад"""
+        first_page = self.client.get(reverse('posts:index'))
+        page_obj = first_page.context['page_obj']
+        self.assertEqual(len(page_obj), 10)
+        self.assertTrue(page_obj.has_next())
+        self.assertFalse(page_obj.has_previous())
+        self.assertContains(first_page, f'?cursor={page_obj.next_cursor}')
+
+        second_page = self.client.get(
+            reverse('posts:index'), {'cursor': page_obj.next_cursor})
+        second_obj = second_page.context['page_obj']
+        self.assertEqual(len(second_obj), 3)
+        self.assertFalse(second_obj.has_next())
+        self.assertTrue(second_obj.has_previous())
+
+        back_page = self.client.get(
+            reverse('posts:index'), {'cursor': second_obj.previous_cursor})
+        self.assertEqual(list(back_page.context['page_obj']),
+                         list(page_obj))
+
+    def test_invalid_cursor(self):
+        """Битый курсор открывает первую страницу"""
+        response = self.client.get(reverse('posts:index'),
+                                   {'cursor': 'garbage'})
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+
+class FeedQueryCountTests(TestCase):
+    # Потолок запросов на страницу из 10 постов при холодном кэше:
+    # подсчёт постов, выборка страницы и, где нужно, группа или автор
+    # для самой страницы и для её ETag.
+    MAX_QUERIES = {
+        'posts:index': 2,
+        'posts:group_list': 4,
+        'posts:profile': 4,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='HasNoName', first_name='Имя', last_name='Фамилия')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='test-slug',
+            description='Описание'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.user, group=cls.group)
+            for i in range(10))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_query_count(self):
+        """Ленты не делают отдельных запросов на каждый пост"""
+        urls = {
+            'posts:index': reverse('posts:index'),
+            'posts:group_list': reverse('posts:group_list',
+                                        kwargs={'slug': 'test-slug'}),
+            'posts:profile': reverse('posts:profile',
+                                     kwargs={'username': 'HasNoName'}),
+        }
+        for name, url in urls.items():
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(len(response.context['page_obj']), 10)
+                self.assertContains(response, 'Имя Фамилия')
+                self.assertLessEqual(len(queries), self.MAX_QUERIES[name])
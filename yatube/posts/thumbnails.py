@@ -0,0 +1,115 @@
+"""Миниатюры картинок постов.
+
+Миниатюры всех размеров SIZES строит фоновая задача
+posts.tasks.make_thumbnails сразу после загрузки картинки. Шаблоны
+только ищут готовую миниатюру в хранилище ключ-значение sorl-thumbnail
+(THUMBNAIL_KVSTORE: кэш поверх таблицы в базе) и не открывают файлы
+картинок; пока миниатюры нет, выводится исходная картинка.
+
+Картинки удалённых и изменённых постов и их миниатюры остаются на
+диске, их убирает команда cleanup_media.
+"""
+import posixpath
+from datetime import timedelta
+
+from django.utils import timezone
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings, settings
+from sorl.thumbnail.images import ImageFile
+
+from .models import Post
+
+# Имя размера -> (геометрия sorl, опции).
+SIZES = {
+    'small': ('480x270', {'crop': 'center'}),
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+    'full': ('1200', {'upscale': False}),
+}
+
+
+class LookupBackend(ThumbnailBackend):
+    """Backend sorl, который умеет искать миниатюру без её создания."""
+
+    def lookup(self, file_, geometry_string, **options):
+        """Готовая миниатюра из хранилища ключ-значение или None."""
+        source = ImageFile(file_)
+        # Опции дополняются так же, как в ThumbnailBackend.get_thumbnail,
+        # иначе не совпадёт имя файла миниатюры.
+        if settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+backend = LookupBackend()
+
+
+def generate(image):
+    """Строит миниатюры всех размеров; уже готовые пропускаются."""
+    for geometry, options in SIZES.values():
+        get_thumbnail(image, geometry, **options)
+
+
+def url(image, size):
+    """URL миниатюры размера size, пока её нет — исходной картинки."""
+    geometry, options = SIZES[size]
+    thumbnail = backend.lookup(image, geometry, **options)
+    return thumbnail.url if thumbnail is not None else image.url
+
+
+def _walk(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield posixpath.join(path, name)
+    for directory in directories:
+        yield from _walk(storage, posixpath.join(path, directory))
+
+
+def _stale(storage, path, grace):
+    """Файлы под path старше grace: более свежий файл может быть
+    загружен запросом, который ещё не сохранил пост."""
+    if not storage.exists(path):
+        return
+    border = timezone.now() - grace
+    for name in _walk(storage, path):
+        if storage.get_modified_time(name) < border:
+            yield name
+
+
+def orphaned_images(grace=timedelta(hours=1)):
+    """Загруженные картинки, на которые не ссылается ни один пост."""
+    field = Post._meta.get_field('image')
+    used = set(Post.objects.exclude(image='')
+               .values_list('image', flat=True).iterator())
+    return [ImageFile(name, field.storage)
+            for name in _stale(field.storage, field.upload_to.rstrip('/'),
+                               grace)
+            if name not in used]
+
+
+def _known_thumbnails():
+    # У хранилища sorl нет публичного обхода ключей.
+    kvstore = default.kvstore
+    names = set()
+    for key in kvstore._find_keys(identity='thumbnails'):
+        for thumbnail_key in kvstore._get(key, identity='thumbnails') or ():
+            thumbnail = kvstore._get(thumbnail_key)
+            if thumbnail is not None:
+                names.add(thumbnail.name)
+    return names
+
+
+def orphaned_thumbnails(grace=timedelta(hours=1)):
+    """Файлы миниатюр, которых нет в хранилище ключ-значение."""
+    known = _known_thumbnails()
+    return [ImageFile(name, default.storage)
+            for name in _stale(default.storage,
+                               settings.THUMBNAIL_PREFIX.rstrip('/'), grace)
+            if name not in known]
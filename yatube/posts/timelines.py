@@ -0,0 +1,113 @@
+"""Материализованные ленты: упорядоченные списки id постов в кэше.
+
+Лента области (см. posts.counters) хранит до TIMELINE_LENGTH пар
+(pub_date, id) в порядке ленты. Страница N — это срез списка и один
+запрос id__in, без ORDER BY по всей области. Список строится по базе
+при промахе кэша и дальше поддерживается сигналами.
+
+Список всегда остаётся точным началом ленты из базы. Если в него
+попали не все посты области, страницы за его концом читаются из базы
+обычным OFFSET, а посты старше последней записи в него не добавляются.
+Запись в кэш не атомарна: одновременные правки одной ленты могут
+потерять изменение, поэтому список живёт не дольше TIMELINE_TIMEOUT.
+"""
+import bisect
+from collections.abc import Sequence
+
+from django.core.cache import cache
+
+from core import routers
+
+from . import counters
+
+TIMELINE_LENGTH = 1000
+TIMELINE_TIMEOUT = 60 * 60
+
+
+def _key(scope):
+    return f'posts:timeline:{scope}'
+
+
+def _entry(pub_date, pk):
+    # Отрицательные значения: bisect работает по возрастанию,
+    # а лента идёт от новых постов к старым.
+    return (-pub_date.timestamp(), -pk)
+
+
+def entries(scope, queryset):
+    """Возвращает (complete, entries) ленты, при промахе строит её."""
+    stored = cache.get(_key(scope))
+    if stored is None:
+        rows = (queryset.order_by('-pub_date', '-pk')
+                .values_list('pub_date', 'pk')[:TIMELINE_LENGTH])
+        with routers.primary():
+            items = [_entry(pub_date, pk) for pub_date, pk in rows]
+        stored = (len(items) < TIMELINE_LENGTH, items)
+        cache.add(_key(scope), stored, TIMELINE_TIMEOUT)
+    return stored
+
+
+def add(scope, post):
+    stored = cache.get(_key(scope))
+    if stored is None:
+        # Ленты нет в кэше — она будет построена при первом чтении.
+        return
+    complete, items = stored
+    entry = _entry(post.pub_date, post.pk)
+    position = bisect.bisect_left(items, entry)
+    if position < len(items) and items[position] == entry:
+        return
+    if position == len(items) and not complete:
+        # Пост старше всего списка: его место в той части ленты,
+        # что читается из базы.
+        return
+    items.insert(position, entry)
+    if len(items) > TIMELINE_LENGTH:
+        del items[TIMELINE_LENGTH:]
+        complete = False
+    cache.set(_key(scope), (complete, items), TIMELINE_TIMEOUT)
+
+
+def remove(scope, post_id):
+    stored = cache.get(_key(scope))
+    if stored is None:
+        return
+    complete, items = stored
+    kept = [item for item in items if item[1] != -post_id]
+    if len(kept) != len(items):
+        cache.set(_key(scope), (complete, kept), TIMELINE_TIMEOUT)
+
+
+def forget(scope):
+    cache.delete(_key(scope))
+
+
+class TimelinePosts(Sequence):
+    """Посты ленты для Paginator: срез списка id плюс запрос id__in.
+
+    queryset задаёт саму ленту (фильтр области и нужные поля) и
+    используется для построения списка, подсчёта и глубоких страниц.
+    """
+
+    def __init__(self, scope, queryset):
+        self.scope = scope
+        self.queryset = queryset
+
+    def __len__(self):
+        complete, items = entries(self.scope, self.queryset)
+        if complete:
+            return len(items)
+        return counters.get_count(self.scope, self.queryset)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _ = index.indices(len(self))
+        complete, items = entries(self.scope, self.queryset)
+        if stop > len(items) and not complete:
+            return list(self.queryset.order_by('-pub_date', '-pk')
+                        [start:stop])
+        ids = [-pk for _, pk in items[start:stop]]
+        posts = self.queryset.in_bulk(ids)
+        # Пост мог быть удалён в обход сигналов: просто пропускаем его.
+        return [posts[pk] for pk in ids if pk in posts]
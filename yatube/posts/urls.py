@@ -8,8 +8,23 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     # Профайл пользователя
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/follow/', views.profile_follow,
+         name='profile_follow'),
+    path('profile/<str:username>/unfollow/', views.profile_unfollow,
+         name='profile_unfollow'),
+    path('follow/', views.follow_index, name='follow_index'),
     # Просмотр записи
     path('posts/<int:post_id>/', views.post_details, name='post_details'),
+    path('search/', views.search, name='search'),
+    path('export/posts/', views.export_posts, name='export_posts'),
+    # JSON-API для чтения
+    path('api/posts/', views.api_index, name='api_index'),
+    path('api/posts/<int:post_id>/', views.api_post_details,
+         name='api_post_details'),
+    path('api/group/<slug:slug>/', views.api_group_list,
+         name='api_group_list'),
+    path('api/profile/<str:username>/', views.api_profile,
+         name='api_profile'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
 ]
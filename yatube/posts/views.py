@@ -1,9 +1,24 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.utils.http import urlencode
+from django.views.decorators.http import etag
+
+from core.ratelimit import ratelimit
+from core.streaming import render_streaming
+
 from .forms import PostForm
-from .models import Post, Group
+from .models import Follow, Post, Group
+from . import (
+    api, counters, etags, export, feed_cache, inboxes, timelines
+)
+from .paginators import (
+    CachedCountPaginator, CursorPaginator, WindowPaginator
+)
+from .search import search_posts
 
 User = get_user_model()
 
@@ -11,52 +26,80 @@ COUNT_POST = 10
 TITLE_LENGTH = 30
 
 
-def paginate(request, posts):
-    paginator = Paginator(posts, COUNT_POST)
+def paginate(request, posts, count_scope=counters.ALL, timeline=False):
+    """Страница ленты; timeline=True читает её из posts.timelines."""
+    cursor = request.GET.get('cursor')
+    if cursor is not None or settings.POSTS_PAGINATION == 'cursor':
+        paginator = CursorPaginator(posts, COUNT_POST, count_scope)
+        return paginator.get_page(cursor)
+    if timeline:
+        paginator = WindowPaginator(
+            timelines.TimelinePosts(count_scope, posts), COUNT_POST)
+    else:
+        paginator = CachedCountPaginator(posts, COUNT_POST, count_scope)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
+def render_feed(request, template_name, context):
+    """Лента целиком или потоком, смотря по POSTS_STREAMING."""
+    if settings.POSTS_STREAMING:
+        return render_streaming(request, template_name, context)
+    return render(request, template_name, context)
+
+
+@etag(etags.index_etag)
 def index(request):
-    post_list = Post.objects.select_related('group').all()
+    post_list = Post.objects.for_feed()
     page_obj = paginate(request, post_list)
     context = {
         'page_obj': page_obj,
+        **feed_cache.fragment_context(request, counters.ALL),
     }
-    return render(request, 'posts/index.html', context)
+    return render_feed(request, 'posts/index.html', context)
 
 
+@etag(etags.group_etag)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = paginate(request, posts)
+    scope = counters.group_scope(group.pk)
+    page_obj = paginate(request, group.posts.for_feed(), scope,
+                        timeline=True)
     context = {
         'group': group,
         'page_obj': page_obj,
+        **feed_cache.fragment_context(request, scope),
         'title': f'Записи сообщества {group}',
     }
-    return render(request, 'posts/group_list.html', context)
+    return render_feed(request, 'posts/group_list.html', context)
 
 
+@etag(etags.profile_etag)
 def profile(request, username):
     template = 'posts/profile.html'
     user = get_object_or_404(User, username=username)
-    posts = user.posts.all()
-    paginator = Paginator(posts, COUNT_POST)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    scope = counters.author_scope(user.pk)
+    page_obj = paginate(request, user.posts.for_feed(), scope)
 
+    following = (
+        request.user.is_authenticated
+        and Follow.objects.filter(user=request.user, author=user).exists()
+    )
     context = {
         'author': user,
-        'count': paginator.count,
+        'count': page_obj.paginator.count,
+        'following': following,
         'page_obj': page_obj,
+        **feed_cache.fragment_context(request, scope),
     }
-    return render(request, template, context)
+    return render_feed(request, template, context)
 
 
+@etag(etags.post_etag)
 def post_details(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id)
     context = {
         'id': post_id,
         'post': post,
@@ -65,9 +108,100 @@ def post_details(request, post_id):
     return render(request, template, context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    paginator = WindowPaginator(search_posts(query), COUNT_POST)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        # Ссылки пагинатора должны сохранять сам запрос.
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@staff_member_required
+def export_posts(request):
+    fmt = request.GET.get('format', 'jsonl')
+    if fmt not in export.FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат выгрузки.')
+    try:
+        since = export.parse_bound(request.GET.get('since'))
+        until = export.parse_bound(request.GET.get('until'))
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    lines = export.export_lines(
+        fmt,
+        group=request.GET.get('group'),
+        author=request.GET.get('author'),
+        since=since,
+        until=until,
+    )
+    response = StreamingHttpResponse(
+        lines, content_type=export.CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="posts.{fmt}"'
+    return response
+
+
+@etag(etags.index_etag)
+def api_index(request):
+    return api.feed_response(request, Post.objects.all(), counters.ALL)
+
+
+@etag(etags.group_etag)
+def api_group_list(request, slug):
+    group_id = (Group.objects.filter(slug=slug)
+                .values_list('pk', flat=True).first())
+    if group_id is None:
+        return api.error('Сообщество не найдено.', status=404)
+    return api.feed_response(request, Post.objects.filter(group_id=group_id),
+                             counters.group_scope(group_id))
+
+
+@etag(etags.profile_etag)
+def api_profile(request, username):
+    author_id = (User.objects.filter(username=username)
+                 .values_list('pk', flat=True).first())
+    if author_id is None:
+        return api.error('Автор не найден.', status=404)
+    return api.feed_response(request,
+                             Post.objects.filter(author_id=author_id),
+                             counters.author_scope(author_id))
+
+
+@etag(etags.post_etag)
+def api_post_details(request, post_id):
+    return api.post_response(request, Post.objects.filter(pk=post_id))
+
+
+@login_required
+def follow_index(request):
+    paginator = WindowPaginator(inboxes.FollowFeed(request.user.pk),
+                                COUNT_POST)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return render(request, 'posts/follow.html', {'page_obj': page_obj})
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return redirect('posts:profile', username)
+
+
 @login_required
+@ratelimit('30/m', key='user')
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
 
     if form.is_valid():
         post = form.save(commit=False)
@@ -79,6 +213,7 @@ def post_create(request):
 
 
 @login_required
+@ratelimit('60/m', key='user')
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
 
@@ -86,7 +221,8 @@ def post_edit(request, post_id):
         return redirect('posts:post_details', post_id)
 
     if request.method == 'POST':
-        form = PostForm(request.POST, instance=post)
+        form = PostForm(request.POST, files=request.FILES or None,
+                        instance=post)
         if form.is_valid():
             form.save()
             return redirect('posts:post_details', post_id)
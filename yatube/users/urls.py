@@ -1,5 +1,8 @@
 from django.contrib.auth.views import LoginView, LogoutView, PasswordResetView
 from django.urls import path
+
+from core.ratelimit import ratelimit
+
 from . import views
 
 app_name = 'users'
@@ -10,16 +13,21 @@ urlpatterns = [
         LogoutView.as_view(template_name='users/logged_out.html'),
         name='logout'
     ),
-    path('signup/', views.SignUp.as_view(), name='signup'),
+    path(
+        'signup/',
+        ratelimit('10/h')(views.SignUp.as_view()),
+        name='signup'
+    ),
     path(
         'login/',
-        LoginView.as_view(template_name='users/login.html'),
+        ratelimit('20/m')(
+            LoginView.as_view(template_name='users/login.html')),
         name='login',
     ),
     path(
         'password_reset/',
-        PasswordResetView.as_view(
-            template_name='users/password_reset_form.html'),
+        ratelimit('5/m')(PasswordResetView.as_view(
+            template_name='users/password_reset_form.html')),
         name='password_reset_form'
     ),
 ]
@@ -0,0 +1,22 @@
+"""Профиль настроек выбирается переменной окружения YATUBE_ENV.
+
+    YATUBE_ENV=dev   локальная разработка (по умолчанию);
+    YATUBE_ENV=test  прогон тестов (manage.py test выбирает его сам);
+    YATUBE_ENV=prod  боевой сервер и стейджинг.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENVIRONMENT = os.environ.get('YATUBE_ENV', 'dev')
+
+if ENVIRONMENT == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif ENVIRONMENT == 'test':
+    from .test import *  # noqa: F401,F403
+elif ENVIRONMENT == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль YATUBE_ENV={ENVIRONMENT!r}: '
+        f'ожидается dev, test или prod.')
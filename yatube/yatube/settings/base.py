@@ -0,0 +1,259 @@
+"""
+Django settings for yatube project.
+
+Общие настройки всех профилей; сами профили лежат рядом (dev, test,
+prod), а нужный выбирает yatube/settings/__init__.py.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ.get(
+    'DJANGO_SECRET_KEY', 'gy832*79o49qamax8xn@w#!67_sklht9mv74ead5tfozt2s&nw')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'core.apps.CoreConfig',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'core.middleware.RateLimitMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'core.template_backends.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+# Компилировать ли все шаблоны при старте WSGI-приложения
+# (см. settings/prod.py).
+TEMPLATE_WARMUP = False
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': os.environ.get(
+            'DATABASE_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': os.environ.get(
+            'DATABASE_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'USER': os.environ.get('DATABASE_USER', ''),
+        'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+        'HOST': os.environ.get('DATABASE_HOST', ''),
+        'PORT': os.environ.get('DATABASE_PORT', ''),
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 0)),
+    }
+}
+
+# Реплики только для чтения: DATABASE_REPLICAS перечисляет их имена
+# (для SQLite — пути к файлам) через запятую. Чтение безопасных запросов
+# уходит на них через core.routers.ReplicaRouter. Локально реплику
+# изображает копия файла базы:
+#     cp db.sqlite3 replica.sqlite3
+#     DATABASE_REPLICAS=replica.sqlite3 python manage.py runserver
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+        filter(None, os.environ.get('DATABASE_REPLICAS', '').split(','))):
+    alias = f'replica{number}'
+    DATABASES[alias] = dict(DATABASES['default'], NAME=name,
+                            TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Сколько секунд после записи читать из основной базы (read-your-writes).
+REPLICA_PIN_SECONDS = 10
+
+# PRAGMA, которые core.signals выполняет на каждом новом соединении с
+# SQLite (journal_mode хранится в файле базы и ставится один раз на
+# процесс). В режиме WAL читатели не ждут единственного писателя, а
+# synchronous=NORMAL в WAL не теряет целостность при сбое процесса.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение задаёт размер кэша в КиБ, а не в страницах.
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# Бэкенд задаётся окружением: locmem по умолчанию и в тестах,
+# FileBasedCache или MemcachedCache на боевом сервере (см. prod.py).
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Время жизни отрендеренных страниц лент (см. posts.feed_cache).
+FEED_CACHE_TIMEOUT = 60 * 15
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Отдавать собранную в STATIC_ROOT статику WSGI-обёрткой
+# core.staticfiles.StaticFiles, без отдельного веб-сервера.
+STATIC_SERVE = False
+
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Загружаемые картинки постов: предельный размер файла и число пикселей.
+POST_IMAGE_MAX_SIZE = 5 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40_000_000
+
+# Миниатюры sorl-thumbnail ищутся по ключам в кэше поверх таблицы в базе.
+THUMBNAIL_KVSTORE = 'sorl.thumbnail.kvstores.cached_db_kvstore.KVStore'
+
+# Сколько одинаковых SQL-запросов за запрос считать признаком N+1.
+REQUEST_METRICS_DUPLICATE_THRESHOLD = 3
+
+# Режим пагинации лент: 'offset' (?page=) или 'cursor' (?cursor=).
+POSTS_PAGINATION = 'offset'
+
+# Авторы с таким числом подписчиков не рассылают посты во входящие
+# ленты подписчиков, а подмешиваются в них при чтении (posts.inboxes).
+FOLLOW_FANOUT_LIMIT = 1000
+
+# Выполнять фоновые задачи core.tasks сразу при постановке в очередь,
+# а не в воркере manage.py run_worker.
+TASKS_EAGER = False
+
+# Через сколько дней воркер удаляет выполненные и упавшие задачи, а с
+# ними и их ключи идемпотентности.
+TASKS_RETENTION_DAYS = 7
+
+# Лимиты @core.ratelimit.ratelimit; счётчики живут в этом кэше.
+RATELIMIT_ENABLE = True
+RATELIMIT_CACHE = 'default'
+
+# Ответы короче этого не сжимаются. Уровни сжатия страниц ниже
+# максимальных: сжатие идёт на каждый запрос, а не один раз при сборке.
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+RESPONSE_COMPRESSION_LEVELS = {'gzip': 6, 'br': 5}
+
+# Отдавать ленты index, group_posts и profile потоком: <head> с
+# подключением CSS уходит клиенту до выборки постов.
+POSTS_STREAMING = False
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+# LOGOUT_REDIRECT_URL = 'posts:index'
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -0,0 +1,7 @@
+"""Профиль локальной разработки."""
+from .base import *  # noqa: F401,F403
+
+DEBUG = True
+
+# Без отдельного воркера: фоновые задачи выполняются сразу.
+TASKS_EAGER = True
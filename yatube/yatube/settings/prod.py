@@ -0,0 +1,87 @@
+"""Профиль для боевого сервера и стейджинга.
+
+Секретный ключ обязателен и берётся из DJANGO_SECRET_KEY, список
+хостов — из DJANGO_ALLOWED_HOSTS через запятую. Кэш должен быть общим
+для всех процессов: по умолчанию FileBasedCache в CACHE_LOCATION.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS, CACHES, DATABASES, TEMPLATES
+
+DEBUG = False
+
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured('Для профиля prod задайте DJANGO_SECRET_KEY.')
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)).split(',')
+
+# Постоянные соединения: не открывать новое на каждый запрос.
+DATABASES = {
+    alias: dict(
+        database,
+        CONN_MAX_AGE=int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+    )
+    for alias, database in DATABASES.items()
+}
+
+# Версии лент, счётчики, таймлайны и версии ETag сбрасываются записью в
+# кэш. В LocMemCache их увидел бы только процесс, обработавший запись, а
+# остальные воркеры отдавали бы устаревшие страницы и 304.
+CACHES = {
+    'default': dict(
+        CACHES['default'],
+        BACKEND=os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'),
+        LOCATION=os.environ.get('CACHE_LOCATION', '/var/tmp/yatube-cache'),
+    ),
+}
+if CACHES['default']['BACKEND'].endswith('.LocMemCache'):
+    raise ImproperlyConfigured(
+        'Для профиля prod нужен общий для процессов кэш: задайте '
+        'CACHE_BACKEND с FileBasedCache или MemcachedCache.')
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# Скомпилированные шаблоны держим в памяти процесса: без кэширующего
+# загрузчика каждый рендер заново ищет и разбирает файлы. APP_DIRS
+# несовместим с явными loaders, его заменяет app_directories.Loader.
+TEMPLATES = [
+    dict(
+        engine,
+        APP_DIRS=False,
+        OPTIONS=dict(
+            engine['OPTIONS'],
+            debug=False,
+            loaders=[('django.template.loaders.cached.Loader',
+                      TEMPLATE_LOADERS)],
+            context_processors=[
+                processor
+                for processor in engine['OPTIONS']['context_processors']
+                if processor != 'django.template.context_processors.debug'
+            ],
+        ),
+    )
+    for engine in TEMPLATES
+]
+
+# Компилировать все шаблоны при старте WSGI-приложения, а не на первых
+# запросах.
+TEMPLATE_WARMUP = True
+
+# Имена с хэшем содержимого и сжатые копии; статику собирает
+# manage.py collectstatic, а отдаёт core.staticfiles.StaticFiles.
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+STATIC_SERVE = True
+
+# Ленты отдаются потоком, <head> уходит до выборки постов.
+POSTS_STREAMING = True
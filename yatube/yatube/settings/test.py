@@ -0,0 +1,34 @@
+"""Профиль для прогона тестов."""
+import os
+import tempfile
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES
+
+DEBUG = False
+
+# Тесты создают сотни пользователей: PBKDF2 здесь только тратит время.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Кэш не должен зависеть от окружения машины, на которой идут тесты.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Отдельная тестовая база вместо зеркала default: так тесты маршрутизации
+# видят, из какой базы на самом деле прочитаны данные. Остальные тесты
+# читают только из default, пока DATABASE_REPLICAS пуст.
+DATABASES = {
+    'default': DATABASES['default'],
+    'replica': dict(DATABASES['default']),
+}
+DATABASE_REPLICAS = []
+
+TASKS_EAGER = True
+
+# Загруженные в тестах картинки не должны попадать в media проекта.
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), 'yatube-test-media')
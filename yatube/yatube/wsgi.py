@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if settings.STATIC_SERVE:
+    from core.staticfiles import StaticFiles
+
+    application = StaticFiles(application)
+
+if settings.TEMPLATE_WARMUP:
+    from core.template_backends import warm_templates
+
+    warm_templates()